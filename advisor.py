@@ -0,0 +1,225 @@
+"""
+Combat action advisor for D&D 3.5e RPG
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+from combat_engine import Action, ActionType, CombatEngine, DecisionPolicy
+from combat_solver import FLEE_CHANCE
+from combatant import Combatant, HEALING_POTION
+from data_loader import data_loader
+from dice import DiceExpression
+from probability import Distribution, attack_damage_distribution, dice_distribution, expected_damage, hit_chance
+from spell_effects import SAVE_ABILITY, DamageEffect, HealEffect, compiled_spells, save_bonus, save_dc
+
+POTION = "Potion of Healing"
+CACHE_SIZE = 50000  # States remembered; one entry is a few hundred bytes
+
+# Cached action: (type, target side, target index, spell, item, label, score)
+ScoredEntry = Tuple[ActionType, Optional[str], Optional[int], Optional[str], Optional[str], str, float]
+OPPONENT, ALLY = "opponent", "ally"
+
+
+@dataclass
+class Advice:
+    """One legal action and its score"""
+    action: Action
+    label: str
+    score: float
+
+
+def _effective_value(dist: Distribution, hit_points: int, bonus: float = 0.0) -> float:
+    """Expected value capped at hit_points, plus bonus weighted by the chance of reaching them"""
+    value = sum(p * min(v, hit_points) for v, p in dist.outcomes())
+    return value + dist.prob_at_least(hit_points) * bonus if bonus else value
+
+
+def _threat(attacker: Combatant, defender: Combatant) -> float:
+    """Expected damage of one attack"""
+    return expected_damage(attacker.attack_bonus, defender.armor_class, attacker.damage, attacker.damage_bonus)
+
+
+def _danger(engine: CombatEngine, combatant: Combatant) -> float:
+    """Expected damage all opponents deal to a combatant in one round"""
+    return sum(_threat(opponent, combatant) for opponent in engine.opponents_of(combatant))
+
+
+def _healing_weight(engine: CombatEngine, combatant: Combatant) -> float:
+    """How much a healed hit point is worth: 1 once a round of damage could drop the combatant"""
+    return min(1.0, _danger(engine, combatant) / max(1, combatant.current_hp))
+
+
+def _castable_spells(caster: Combatant) -> List[str]:
+    """Spells the caster knows and has a slot for, lowest level first"""
+    if caster.is_monster or 'class' not in caster.source:
+        return []
+    from spells import get_available_spells, get_spell_slots
+
+    current = get_spell_slots(caster.source)["current"]
+    return [
+        name
+        for level, names in sorted(get_available_spells(caster.source).items())
+        if current.get(level, 0) > 0
+        for name in names
+    ]
+
+
+def _special_attack(actor: Combatant, engine: CombatEngine) -> Optional[Tuple[int, DiceExpression, int]]:
+    """(attack bonus, damage, damage bonus) of the actor's special attack, if it has uses left"""
+    if engine.special_uses_left(actor) <= 0:
+        return None
+    special = actor.special_attack
+    return actor.attack_bonus + special.attack_bonus, special.damage, special.damage_bonus
+
+
+def _saves(combatant: Combatant) -> Tuple[int, ...]:
+    return tuple(save_bonus(combatant.source, save) for save in SAVE_ABILITY)
+
+
+class ActionAdvisor:
+    """Scores the legal actions of a combatant, cached per combat state"""
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Tuple[ScoredEntry, ...]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        data_loader.add_reload_listener(self.clear)
+
+    def clear(self):
+        """Forget all cached scores"""
+        self._cache.clear()
+
+    def state_key(self, engine: CombatEngine, actor: Combatant) -> Tuple:
+        """Everything the scores of the actor's actions depend on"""
+        spells = tuple(_castable_spells(actor))
+        return (
+            actor.current_hp, actor.armor_class, actor.attack_bonus, actor.damage, actor.damage_bonus,
+            _special_attack(actor, engine), spells,
+            save_dc(actor.source, 0) if spells else None,
+            actor.inventory.get(POTION, 0) > 0 if not actor.is_monster else False,
+            tuple((a.name, a.current_hp, a.max_hp, a.armor_class) for a in engine.allies_of(actor)),
+            tuple((o.name, o.current_hp, o.armor_class, o.attack_bonus, o.damage, o.damage_bonus, _saves(o))
+                  for o in engine.opponents_of(actor)),
+        )
+
+    def advise(self, engine: CombatEngine, actor: Combatant) -> List[Advice]:
+        """All legal actions of the actor, best first"""
+        key = self.state_key(engine, actor)
+        entries = self._cache.get(key)
+        if entries is None:
+            self.misses += 1
+            entries = tuple(sorted(self._score(engine, actor), key=lambda entry: -entry[-1]))
+            self._cache[key] = entries
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+
+        sides = {OPPONENT: engine.opponents_of(actor), ALLY: engine.allies_of(actor)}
+        return [
+            Advice(Action(action_type, sides[side][index] if side else None, spell, item), label, score)
+            for action_type, side, index, spell, item, label, score in entries
+        ]
+
+    def best(self, engine: CombatEngine, actor: Combatant) -> Advice:
+        """The highest scoring action (attacking the first opponent on ties)"""
+        return self.advise(engine, actor)[0]
+
+    def _score(self, engine: CombatEngine, actor: Combatant) -> Iterable[ScoredEntry]:
+        opponents = engine.opponents_of(actor)
+        allies = engine.allies_of(actor)
+        threats = [_threat(opponent, actor) for opponent in opponents]
+
+        for i, opponent in enumerate(opponents):
+            dist = attack_damage_distribution(actor.attack_bonus, opponent.armor_class,
+                                              actor.damage, actor.damage_bonus)
+            yield (ActionType.ATTACK, OPPONENT, i, None, None, f"Attack {opponent.name}",
+                   _effective_value(dist, opponent.current_hp, threats[i]))
+
+        special = _special_attack(actor, engine)
+        if special is not None:
+            attack_bonus, damage, damage_bonus = special
+            for i, opponent in enumerate(opponents):
+                dist = attack_damage_distribution(attack_bonus, opponent.armor_class, damage, damage_bonus)
+                yield (ActionType.SPECIAL_ATTACK, OPPONENT, i, None, None,
+                       f"{actor.special_attack.name} on {opponent.name}",
+                       _effective_value(dist, opponent.current_hp, threats[i]))
+
+        for spell_name in _castable_spells(actor):
+            yield from self._score_spell(engine, actor, spell_name, opponents, allies, threats)
+
+        if not actor.is_monster and actor.inventory.get(POTION, 0) > 0:
+            missing = actor.max_hp - actor.current_hp
+            yield (ActionType.USE_ITEM, ALLY, allies.index(actor), None, POTION, f"Use {POTION}",
+                   _effective_value(dice_distribution(HEALING_POTION), missing) * _healing_weight(engine, actor))
+
+        danger = sum(threats)
+        yield (ActionType.FLEE, None, None, None, None, "Flee",
+               FLEE_CHANCE * danger if danger >= actor.current_hp else 0.0)
+
+    def _score_spell(self, engine: CombatEngine, caster: Combatant, spell_name: str,
+                     opponents: List[Combatant], allies: List[Combatant],
+                     threats: List[float]) -> Iterable[ScoredEntry]:
+        spell = compiled_spells.get(spell_name)
+        effect = spell.effect
+        label = f"Cast {spell_name}"
+
+        if spell.area_effect:
+            if isinstance(effect, DamageEffect):
+                score = self._area_damage(caster, spell.level, effect, opponents, threats)
+            elif isinstance(effect, HealEffect):
+                score = sum(self._healing(engine, effect.amount, ally) for ally in allies)
+            else:
+                score = 0.0
+            yield ActionType.CAST_SPELL, None, None, spell_name, None, label, score
+        elif isinstance(effect, DamageEffect):
+            dist = dice_distribution(effect.amount)
+            for i, opponent in enumerate(opponents):
+                yield (ActionType.CAST_SPELL, OPPONENT, i, spell_name, None, f"{label} on {opponent.name}",
+                       _effective_value(dist, opponent.current_hp, threats[i]))
+        elif isinstance(effect, HealEffect):
+            for i, ally in enumerate(allies):
+                yield (ActionType.CAST_SPELL, ALLY, i, spell_name, None, f"{label} on {ally.name}",
+                       self._healing(engine, effect.amount, ally))
+        elif effect.requires_target:
+            yield ActionType.CAST_SPELL, OPPONENT, 0, spell_name, None, f"{label} on {opponents[0].name}", 0.0
+        else:
+            yield ActionType.CAST_SPELL, ALLY, allies.index(caster), spell_name, None, label, 0.0
+
+    def _healing(self, engine: CombatEngine, amount: DiceExpression, target: Combatant) -> float:
+        missing = target.max_hp - target.current_hp
+        return _effective_value(dice_distribution(amount), missing) * _healing_weight(engine, target)
+
+    def _area_damage(self, caster: Combatant, level: int, effect: DamageEffect,
+                     opponents: List[Combatant], threats: List[float]) -> float:
+        """One damage roll for everyone, halved or negated for those who save"""
+        dc = save_dc(caster.source, level)
+        save_chances = [
+            hit_chance(save_bonus(opponent.source, effect.save), dc) if effect.save else 0.0
+            for opponent in opponents
+        ]
+        score = 0.0
+        for damage, p in dice_distribution(effect.amount).outcomes():
+            saved_damage = damage // 2 if effect.save_outcome == "half" else 0
+            for opponent, threat, save_chance in zip(opponents, threats, save_chances):
+                hp = opponent.current_hp
+                full = min(damage, hp) + (threat if damage >= hp else 0.0)
+                reduced = min(saved_damage, hp) + (threat if saved_damage >= hp else 0.0)
+                score += p * ((1 - save_chance) * full + save_chance * reduced)
+        return score
+
+
+# Global action advisor instance
+action_advisor = ActionAdvisor()
+
+
+class AdvisorPolicy(DecisionPolicy):
+    """Always takes the advisor's best action; for bots and auto-play"""
+
+    def __init__(self, advisor: Optional[ActionAdvisor] = None):
+        self.advisor = advisor  # None uses the global advisor, also in worker processes
+
+    def choose_action(self, engine: CombatEngine, actor: Combatant) -> Action:
+        return (self.advisor or action_advisor).best(engine, actor).action
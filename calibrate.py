@@ -0,0 +1,263 @@
+"""
+Encounter difficulty calibration for D&D 3.5e RPG
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from rng import RNGService, DUNGEON
+from simulation import DEFAULT_ABILITIES
+
+# One job: (level, class, opponent) where opponent is a monster type or None for random encounters
+Job = Tuple[int, str, Optional[str]]
+# Job result: (win rate, mean hit points lost)
+JobResult = Tuple[float, float]
+
+DEFAULT_TARGET_WIN_RATE = 0.75
+DEFAULT_TARGET_SURVIVAL = 0.5
+DEFAULT_BATTLES = 5000
+DUNGEON_SAMPLES = 2000
+XP_ROUNDING = 5
+BOSS_ROOM = "boss_room"
+
+
+def run_job(job: Job, race: str, battles: int, seed: int) -> JobResult:
+    """Fight one batch of battles in the combat engine (runs inside a worker)"""
+    from advisor import AdvisorPolicy
+    from character_rules import build_character
+    from monster_ai import MonsterAIPolicy
+    from simulation import run_trials
+
+    level, character_class, monster_type = job
+    character = build_character("Calibration Hero", race, character_class, DEFAULT_ABILITIES, level)
+    results = run_trials(character, [monster_type] if monster_type else None, battles, seed,
+                         f"/calibrate/{level}/{character_class}/{monster_type}",
+                         AdvisorPolicy(), MonsterAIPolicy())
+
+    win_rate = sum(1 for outcome, _, _ in results if outcome == "victory") / battles
+    hp_lost = character['max_hp'] - sum(max(0, hp) for _, _, hp in results) / battles
+    return win_rate, hp_lost
+
+
+def run_jobs(jobs: Sequence[Job], race: str, battles: int, seed: int,
+             workers: Optional[int] = None) -> Dict[Job, JobResult]:
+    """Run every job, on a process pool unless workers is 1"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return {job: run_job(job, race, battles, seed) for job in jobs}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {job: pool.submit(run_job, job, race, battles, seed) for job in jobs}
+        return {job: future.result() for job, future in futures.items()}
+
+
+def fit_monster_levels(results: Dict[Job, JobResult], monster_types: Sequence[str], levels: Sequence[int],
+                       classes: Sequence[str], target_win_rate: float) -> Dict[str, Tuple[int, bool]]:
+    """Lowest level reaching the target win rate per monster, and whether it was reached at all"""
+    fitted = {}
+    for monster_type in monster_types:
+        fitted[monster_type] = (max(levels), False)
+        for level in sorted(levels):
+            win_rate = sum(results[(level, c, monster_type)][0] for c in classes) / len(classes)
+            if win_rate >= target_win_rate:
+                fitted[monster_type] = (level, True)
+                break
+    return fitted
+
+
+def fit_xp_values(results: Dict[Job, JobResult], monsters: Dict[str, Any], level: int,
+                  classes: Sequence[str]) -> Dict[str, int]:
+    """XP proportional to expected hit points lost, keeping the total XP of all monsters"""
+    threat = {
+        name: max(1e-9, sum(results[(level, c, name)][1] for c in classes) / len(classes))
+        for name in monsters
+    }
+    scale = sum(m.get('xp_value', 0) for m in monsters.values()) / sum(threat.values())
+    return {
+        name: max(XP_ROUNDING, int(round(threat[name] * scale / XP_ROUNDING)) * XP_ROUNDING)
+        for name in monsters
+    }
+
+
+def average_room_counts(samples: int, seed: int) -> Dict[str, float]:
+    """Mean number of rooms of each type in a generated dungeon"""
+    from dungeon import Dungeon
+
+    rng = RNGService(seed, "/calibrate/dungeons").stream(DUNGEON)
+    counts: Dict[str, float] = {}
+    for _ in range(samples):
+        for room in Dungeon(rng=rng).rooms.values():
+            counts[room.room_type] = counts.get(room.room_type, 0) + 1
+    return {room_type: count / samples for room_type, count in counts.items()}
+
+
+def dungeon_survival(chances: Dict[str, float], room_counts: Dict[str, float], win_rate: float) -> float:
+    """Chance of surviving every encounter of an average dungeon"""
+    survival = 1.0
+    for room_type, count in room_counts.items():
+        survival *= (1 - chances[room_type] * (1 - win_rate)) ** count
+    return survival
+
+
+def scaled_chances(base: Dict[str, float], factor: float) -> Dict[str, float]:
+    """Room encounter chances scaled by factor, boss room unchanged"""
+    return {
+        room_type: chance if room_type == BOSS_ROOM else min(1.0, chance * factor)
+        for room_type, chance in base.items()
+    }
+
+
+def fit_room_chances(base: Dict[str, float], room_counts: Dict[str, float],
+                     win_rates: Dict[int, float], target_survival: float) -> Tuple[float, Dict[str, float]]:
+    """Common scale factor for room chances minimizing squared survival error over levels"""
+    top = max(1.0, max(1.0 / c for t, c in base.items() if t != BOSS_ROOM and c > 0))
+
+    def error(factor: float) -> float:
+        chances = scaled_chances(base, factor)
+        return sum((dungeon_survival(chances, room_counts, w) - target_survival) ** 2
+                   for w in win_rates.values())
+
+    # Grid search, then refine around the best point
+    low, high = 0.0, top
+    best = 1.0
+    for _ in range(4):
+        step = (high - low) / 50
+        best = min((low + i * step for i in range(51)), key=error)
+        low, high = max(0.0, best - step), min(top, best + step)
+    return best, scaled_chances(base, best)
+
+
+def calibrate(levels: Sequence[int], classes: Sequence[str], race: str = "Human", battles: int = DEFAULT_BATTLES,
+              target_win_rate: float = DEFAULT_TARGET_WIN_RATE,
+              target_survival: float = DEFAULT_TARGET_SURVIVAL,
+              workers: Optional[int] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Run the simulations and fit every calibrated value"""
+    from data_loader import data_loader
+    from dungeon import ROOM_TYPES, get_encounter_chance
+
+    seed = RNGService(seed).seed
+    monsters = data_loader.monsters
+    jobs: List[Job] = [(level, c, m) for level in levels for c in classes for m in list(monsters) + [None]]
+    results = run_jobs(jobs, race, battles, seed, workers)
+
+    encounter_win_rates = {
+        level: sum(results[(level, c, None)][0] for c in classes) / len(classes) for level in levels
+    }
+    base_chances = {room_type: get_encounter_chance(room_type) for room_type in ROOM_TYPES}
+    room_counts = average_room_counts(DUNGEON_SAMPLES, seed)
+    factor, chances = fit_room_chances(base_chances, room_counts, encounter_win_rates, target_survival)
+
+    return {
+        'seed': seed,
+        'levels': list(levels),
+        'classes': list(classes),
+        'battles': battles,
+        'target_win_rate': target_win_rate,
+        'target_survival': target_survival,
+        'results': results,
+        'monster_levels': fit_monster_levels(results, list(monsters), levels, classes, target_win_rate),
+        'xp_values': fit_xp_values(results, monsters, min(levels), classes),
+        'encounter_win_rates': encounter_win_rates,
+        'room_counts': room_counts,
+        'base_chances': base_chances,
+        'room_factor': factor,
+        'room_chances': chances,
+    }
+
+
+def format_report(calibration: Dict[str, Any]) -> str:
+    """Human readable calibration report"""
+    from data_loader import data_loader
+
+    levels, classes, results = calibration['levels'], calibration['classes'], calibration['results']
+    monsters = data_loader.monsters
+    lines = [
+        "Encounter calibration report",
+        f"Seed {calibration['seed']}, {calibration['battles']} battles per job, classes: {', '.join(classes)}",
+        "",
+        f"Monsters (level = lowest character level winning >= {calibration['target_win_rate']:.0%} one on one)",
+        "  " + "Monster".ljust(12) + "".join(f"L{level} win".rjust(9) for level in levels)
+        + "   level (was)   xp (was)",
+    ]
+    for name in monsters:
+        win_rates = [sum(results[(level, c, name)][0] for c in classes) / len(classes) for level in levels]
+        level, reached = calibration['monster_levels'][name]
+        level_text = f"{level}{'' if reached else '+'} ({monsters[name].get('level', 1)})"
+        xp_text = f"{calibration['xp_values'][name]} ({monsters[name].get('xp_value', 0)})"
+        lines.append("  " + name.ljust(12) + "".join(f"{w:9.1%}" for w in win_rates)
+                     + level_text.rjust(14) + xp_text.rjust(11))
+    lines.append("  (+ = target not reached at any calibrated level)")
+
+    chances = calibration['room_chances']
+    lines += [
+        "",
+        f"Rooms (target dungeon survival {calibration['target_survival']:.0%}, "
+        f"scale factor {calibration['room_factor']:.3f})",
+        "  " + "Room".ljust(15) + "rooms/dungeon".rjust(14) + "chance (was)".rjust(18),
+    ]
+    for room_type, base in calibration['base_chances'].items():
+        lines.append("  " + room_type.ljust(15) + f"{calibration['room_counts'].get(room_type, 0.0):14.2f}"
+                     + f"{chances[room_type]:.3f} ({base:.2f})".rjust(18))
+    lines += ["", "  " + "Level".ljust(8) + "encounter win".rjust(14) + "survival".rjust(10) + "(was)".rjust(8)]
+    for level, win_rate in calibration['encounter_win_rates'].items():
+        now = dungeon_survival(chances, calibration['room_counts'], win_rate)
+        was = dungeon_survival(calibration['base_chances'], calibration['room_counts'], win_rate)
+        lines.append("  " + str(level).ljust(8) + f"{win_rate:14.1%}{now:10.1%}{was:8.1%}")
+    return "\n".join(lines)
+
+
+def write_outputs(calibration: Dict[str, Any], output_dir: str):
+    """Write suggested monsters.json, dungeon.json and report.txt"""
+    from config import config
+    from data_loader import data_loader
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    monsters = json.loads(json.dumps(data_loader.monsters))
+    for name, monster in monsters.items():
+        monster['level'] = calibration['monster_levels'][name][0]
+        monster['xp_value'] = calibration['xp_values'][name]
+    with open(output / "monsters.json", 'w') as f:
+        json.dump(monsters, f, indent=2)
+
+    counts = calibration['room_counts']
+    chances = calibration['room_chances']
+    total_rooms = sum(counts.values())
+    dungeon_config = dict(config.config["dungeon"])
+    dungeon_config["room_encounter_chance"] = {t: round(c, 3) for t, c in chances.items()}
+    dungeon_config["encounter_chance"] = round(
+        sum(chances[t] * n for t, n in counts.items()) / total_rooms, 3) if total_rooms else 0.0
+    with open(output / "dungeon.json", 'w') as f:
+        json.dump(dungeon_config, f, indent=2)
+
+    with open(output / "report.txt", 'w') as f:
+        f.write(format_report(calibration) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit encounter difficulty to target win rates")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 3, 4, 5])
+    parser.add_argument("--classes", nargs="+", default=None, help="Classes to average over (default: all)")
+    parser.add_argument("--race", default="Human")
+    parser.add_argument("--battles", type=int, default=DEFAULT_BATTLES, help="Battles per level/class/opponent")
+    parser.add_argument("--target-win-rate", type=float, default=DEFAULT_TARGET_WIN_RATE)
+    parser.add_argument("--target-survival", type=float, default=DEFAULT_TARGET_SURVIVAL)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default="calibration", help="Directory for the suggested files")
+    args = parser.parse_args()
+
+    from data_loader import data_loader
+
+    classes = args.classes or list(data_loader.classes)
+    calibration = calibrate(args.levels, classes, args.race, args.battles, args.target_win_rate,
+                            args.target_survival, args.workers, args.seed)
+    write_outputs(calibration, args.output)
+    print(format_report(calibration))
+    print(f"\nSuggested files written to {args.output}/ (monsters.json -> data/, dungeon.json -> config/)")
+
+
+if __name__ == "__main__":
+    main()
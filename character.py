@@ -9,10 +9,11 @@ from utils import (
 )
 from data_loader import data_loader
 from config import config
+from character_rules import build_character, get_starting_equipment, get_attack_bonus, get_damage_bonus
 
-# Get race and class data from data loader
-RACES = data_loader.races
-CLASSES = data_loader.classes
+# Live views of the race and class data, follow reloads
+RACES = data_loader.view("races")
+CLASSES = data_loader.view("classes")
 
 
 
@@ -54,14 +55,8 @@ def create_character() -> Dict[str, Any]:
         modifier_str = f"+{modifier}" if modifier >= 0 else str(modifier)
         console.print(f"{ability.title()}: {score} ({modifier_str})")
     
-    # Apply racial bonuses
-    race_data = RACES[race]
-    for ability, bonus in race_data.get("ability_bonuses", {}).items():
-        if ability == "all":
-            for abil in abilities:
-                abilities[abil] += bonus
-        else:
-            abilities[ability] += bonus
+    character = build_character(name, race, character_class, abilities)
+    abilities = character['abilities']
     
     console.print(f"\n[green]After racial bonuses:[/green]")
     for ability in ability_names:
@@ -70,47 +65,6 @@ def create_character() -> Dict[str, Any]:
         modifier_str = f"+{modifier}" if modifier >= 0 else str(modifier)
         console.print(f"{ability.title()}: {score} ({modifier_str})")
     
-    # Calculate derived stats
-    class_data = data_loader.get_class(character_class)
-    
-    # Hit Points
-    con_modifier = calculate_modifier(abilities['constitution'])
-    hit_die = int(class_data['hit_die'].replace('d', ''))
-    max_hp = hit_die + con_modifier
-    max_hp = max(1, max_hp)  # Minimum 1 HP
-    
-    # Armor Class
-    dex_modifier = calculate_modifier(abilities['dexterity'])
-    armor_class = 10 + dex_modifier
-    
-    # Initiative
-    initiative_bonus = dex_modifier
-    
-    # Create character dictionary
-    character = {
-        'name': name,
-        'race': race,
-        'class': character_class,
-        'level': 1,
-        'abilities': abilities,
-        'max_hp': max_hp,
-        'current_hp': max_hp,
-        'armor_class': armor_class,
-        'initiative_bonus': initiative_bonus,
-        'experience': 0,
-        'inventory': {},
-        'equipment': get_starting_equipment(character_class),
-        'spells': [] if character_class in ['Wizard', 'Cleric'] else None,
-        'feats': [],
-        'skills': {}
-    }
-    
-    # Add racial traits
-    character['traits'] = race_data.get('traits', [])
-    
-    # Add class features
-    character['class_features'] = class_data.get('class_features', [])
-    
     console.print(f"\n[bold green]Character created successfully![/bold green]")
     
     # Show spell information for spellcasters
@@ -120,29 +74,6 @@ def create_character() -> Dict[str, Any]:
     
     return character
 
-def get_starting_equipment(character_class: str) -> Dict[str, Any]:
-    """Get starting equipment for a character class"""
-    class_data = data_loader.get_class(character_class)
-    if not class_data:
-        return {}
-    
-    equipment = class_data.get('starting_equipment', {})
-    
-    # Convert to inventory format
-    inventory = {}
-    for weapon in equipment.get('weapons', []):
-        inventory[weapon] = 1
-    
-    for armor in equipment.get('armor', []):
-        inventory[armor] = 1
-    
-    for item in equipment.get('items', []):
-        inventory[item] = 1
-    
-    return inventory
-
-
-
 def damage_character(character: Dict[str, Any], amount: int) -> Dict[str, Any]:
     """Damage a character by the specified amount"""
     character['current_hp'] = max(0, character['current_hp'] - amount)
@@ -157,24 +88,3 @@ def damage_character(character: Dict[str, Any], amount: int) -> Dict[str, Any]:
 def is_character_alive(character: Dict[str, Any]) -> bool:
     """Check if character is alive"""
     return character['current_hp'] > 0
-
-def get_attack_bonus(character: Dict[str, Any]) -> int:
-    """Calculate character's attack bonus"""
-    class_data = CLASSES[character['class']]
-    bab_type = class_data['base_attack_bonus']
-    
-    # Simplified BAB calculation
-    if bab_type == "Good":
-        bab = character['level']
-    elif bab_type == "Average":
-        bab = character['level'] * 3 // 4
-    else:  # Poor
-        bab = character['level'] // 2
-    
-    str_modifier = calculate_modifier(character['abilities']['strength'])
-    return bab + str_modifier
-
-def get_damage_bonus(character: Dict[str, Any]) -> int:
-    """Calculate character's damage bonus"""
-    str_modifier = calculate_modifier(character['abilities']['strength'])
-    return str_modifier if str_modifier > 0 else 0 
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Character rules for D&D 3.5e RPG
+"""
+from typing import Dict, Any
+from utils import calculate_modifier
+from data_loader import data_loader
+
+def build_character(name: str, race: str, character_class: str,
+                    abilities: Dict[str, int], level: int = 1) -> Dict[str, Any]:
+    """
+    Build a character from already chosen ability scores, without any prompts.
+    
+    Racial bonuses are applied to a copy of abilities. Hit points are the
+    maximum hit die at 1st level plus the average roll for each later level.
+    """
+    # Apply racial bonuses
+    race_def = data_loader.race_defs[race]
+    abilities = race_def.apply_bonuses(abilities)
+    
+    # Calculate derived stats
+    class_def = data_loader.class_defs[character_class]
+    
+    # Hit Points
+    con_modifier = calculate_modifier(abilities['constitution'])
+    hit_die = class_def.hit_die
+    max_hp = max(1, hit_die + con_modifier)  # Minimum 1 HP
+    max_hp += (level - 1) * max(1, hit_die // 2 + 1 + con_modifier)
+    
+    # Armor Class
+    dex_modifier = calculate_modifier(abilities['dexterity'])
+    armor_class = 10 + dex_modifier
+    
+    # Initiative
+    initiative_bonus = dex_modifier
+    
+    # Create character dictionary
+    character = {
+        'name': name,
+        'race': race,
+        'class': character_class,
+        'level': level,
+        'abilities': abilities,
+        'max_hp': max_hp,
+        'current_hp': max_hp,
+        'armor_class': armor_class,
+        'initiative_bonus': initiative_bonus,
+        'experience': 0,
+        'inventory': {},
+        'equipment': get_starting_equipment(character_class),
+        'spells': [] if character_class in ['Wizard', 'Cleric'] else None,
+        'feats': [],
+        'skills': {}
+    }
+    
+    # Add racial traits
+    character['traits'] = list(race_def.traits)
+    
+    # Add class features
+    character['class_features'] = list(class_def.class_features)
+    
+    return character
+
+def get_starting_equipment(character_class: str) -> Dict[str, Any]:
+    """Get starting equipment for a character class"""
+    class_def = data_loader.class_defs.get(character_class)
+    if not class_def:
+        return {}
+    
+    # Convert to inventory format
+    inventory = {}
+    for items in class_def.starting_equipment.values():
+        for item in items:
+            inventory[item] = 1
+    
+    return inventory
+
+def get_attack_bonus(character: Dict[str, Any]) -> int:
+    """Calculate character's attack bonus"""
+    # Simplified BAB calculation
+    bab = data_loader.class_defs[character['class']].base_attack_bonus(character['level'])
+    
+    str_modifier = calculate_modifier(character['abilities']['strength'])
+    return bab + str_modifier
+
+def get_damage_bonus(character: Dict[str, Any]) -> int:
+    """Calculate character's damage bonus"""
+    str_modifier = calculate_modifier(character['abilities']['strength'])
+    return str_modifier if str_modifier > 0 else 0
@@ -0,0 +1,356 @@
+"""
+Headless combat engine for D&D 3.5e RPG
+"""
+import random
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Union
+from combat_events import CombatEvent, CombatLog, EventType, Subscriber
+from combatant import Combatant, D20, HEALING_POTION, new_combatant_id
+from rng import rng_service, ATTACKS
+
+FLEE_DC = 10  # Simple flee check: 1d20 >= 10
+
+PARTY = 0
+ENEMIES = 1
+
+
+class ActionType(Enum):
+    """Things a combatant can do on its turn"""
+    ATTACK = "attack"
+    SPECIAL_ATTACK = "special_attack"
+    CAST_SPELL = "cast_spell"
+    USE_ITEM = "use_item"
+    FLEE = "flee"
+
+
+@dataclass
+class Action:
+    """A decision made by a policy for one turn"""
+    type: ActionType
+    target: Optional[Combatant] = None
+    spell: Optional[str] = None
+    item: Optional[str] = None
+
+
+@dataclass
+class CombatResult:
+    """Outcome of a finished combat"""
+    outcome: str  # "victory", "defeat", "fled" or "stalemate"
+    rounds: int
+    xp: int = 0
+
+
+class DecisionPolicy:
+    """Chooses an action for a combatant; subclass for humans, bots and AI"""
+
+    def choose_action(self, engine: 'CombatEngine', actor: Combatant) -> Action:
+        raise NotImplementedError
+
+
+class AttackFirstPolicy(DecisionPolicy):
+    """Always attack the first opponent still standing"""
+
+    def choose_action(self, engine: 'CombatEngine', actor: Combatant) -> Action:
+        return Action(ActionType.ATTACK, engine.opponents_of(actor)[0])
+
+
+class AttackWeakestPolicy(DecisionPolicy):
+    """Always attack the opponent with the fewest hit points left"""
+
+    def choose_action(self, engine: 'CombatEngine', actor: Combatant) -> Action:
+        target = min(engine.opponents_of(actor), key=lambda c: c.current_hp)
+        return Action(ActionType.ATTACK, target)
+
+
+class ScriptedPolicy(DecisionPolicy):
+    """Play a fixed list of actions, then fall back to another policy"""
+
+    def __init__(self, actions: List[Action], fallback: Optional[DecisionPolicy] = None):
+        self.actions = list(actions)
+        self.fallback = fallback or AttackFirstPolicy()
+
+    def choose_action(self, engine: 'CombatEngine', actor: Combatant) -> Action:
+        if self.actions:
+            return self.actions.pop(0)
+        return self.fallback.choose_action(engine, actor)
+
+
+def resolve_attack(attacker: Combatant, target: Combatant,
+                   rng: Optional[random.Random] = None) -> Tuple[bool, int, int]:
+    """Roll an attack and return (hit, damage, attack_roll) without applying it"""
+    rng = rng or rng_service.stream(ATTACKS)
+    attack_roll = D20.roll(rng) + attacker.attack_bonus
+    if attack_roll < target.armor_class:
+        return False, 0, attack_roll
+    damage = attacker.damage.roll(rng) + attacker.damage_bonus
+    return True, max(0, damage), attack_roll
+
+
+class CombatEngine:
+    """Runs a fight between a party and a group of enemies"""
+
+    def __init__(self, party: List[Union[Dict[str, Any], Combatant]],
+                 enemies: List[Union[Dict[str, Any], Combatant]],
+                 player_policy: DecisionPolicy, enemy_policy: Optional[DecisionPolicy] = None,
+                 rng: Optional[random.Random] = None,
+                 listeners: Optional[List[Subscriber]] = None,
+                 max_rounds: Optional[int] = None, log: Optional[CombatLog] = None):
+        self.player_policy = player_policy
+        self.enemy_policy = enemy_policy or AttackFirstPolicy()
+        self.rng = rng or rng_service.stream(ATTACKS)
+        self.log = log if log is not None else CombatLog()
+        for listener in listeners or []:
+            self.log.subscribe(listener)
+        self.max_rounds = max_rounds
+        self.round = 0
+        self.initiative_order: List[Combatant] = []
+        self.result: Optional[CombatResult] = None
+        self.hp_changes = 0  # Counts hit point changes, so policies can tell when their plans are stale
+
+        # Side of every combatant by ID, and the living members of each side
+        # in their original order, kept up to date as hit points change
+        self._side: Dict[int, int] = {}
+        self._alive: Tuple[Dict[int, Combatant], Dict[int, Combatant]] = ({}, {})
+        self._fled: Dict[int, Combatant] = {}
+        self._special_uses: Dict[int, int] = {}
+        self.party = [self._enlist(c, PARTY) for c in party]
+        self.enemies = [self._enlist(c, ENEMIES) for c in enemies]
+        self.combatants = self.party + self.enemies
+
+    def _enlist(self, combatant: Union[Dict[str, Any], Combatant], side: int) -> Combatant:
+        """Convert a dict to a Combatant and register it on a side"""
+        if not isinstance(combatant, Combatant):
+            combatant = Combatant.from_dict(combatant)
+        if combatant.id in self._side:
+            combatant.id = new_combatant_id()
+        self._side[combatant.id] = side
+        if combatant.alive:
+            self._alive[side][combatant.id] = combatant
+        return combatant
+
+    def emit(self, event_type: EventType, actor=None, target=None, value=None, **detail):
+        """Record an event in the combat log"""
+        if self.log.active:
+            self.log.append(CombatEvent(event_type, self.round, actor, target, value, detail))
+
+    def is_player(self, combatant: Combatant) -> bool:
+        """Check if a combatant fights on the party's side"""
+        return self._side[combatant.id] == PARTY
+
+    def allies_of(self, combatant: Combatant) -> List[Combatant]:
+        """Living combatants on the same side, including the combatant"""
+        return list(self._alive[self._side[combatant.id]].values())
+
+    def opponents_of(self, combatant: Combatant) -> List[Combatant]:
+        """Living combatants on the other side"""
+        return list(self._alive[1 - self._side[combatant.id]].values())
+
+    def update_status(self, combatant: Combatant):
+        """Record a combatant as standing or down after its hit points changed"""
+        self.hp_changes += 1
+        side = self._side[combatant.id]
+        alive = self._alive[side]
+        if combatant.alive:
+            if combatant.id not in alive:
+                # Revived: rebuild to keep the original order
+                members = self.party if side == PARTY else self.enemies
+                alive.clear()
+                alive.update((c.id, c) for c in members if c.alive and c.id not in self._fled)
+        else:
+            alive.pop(combatant.id, None)
+
+    def roll_initiative(self) -> List[Combatant]:
+        """Roll initiative for everyone and fix the turn order"""
+        rolls = []
+        for combatant in self.combatants:
+            initiative = D20.roll(self.rng) + combatant.initiative_bonus
+            rolls.append((initiative, combatant))
+            self.emit(EventType.INITIATIVE, combatant, value=initiative)
+
+        # Sort by initiative (highest first), then by initiative bonus as tiebreaker
+        rolls.sort(key=lambda x: (x[0], x[1].initiative_bonus), reverse=True)
+        self.initiative_order = [combatant for _, combatant in rolls]
+        return self.initiative_order
+
+    def run(self) -> CombatResult:
+        """Fight until one side is down, the party flees or max_rounds passes"""
+        self.emit(EventType.COMBAT_START, combatants=self.combatants)
+        self.roll_initiative()
+        self._check_end()  # A side may be empty from the start
+
+        while self.result is None:
+            self.round += 1
+            if self.max_rounds is not None and self.round > self.max_rounds:
+                self.result = CombatResult("stalemate", self.round - 1)
+                break
+            self.emit(EventType.ROUND_START, combatants=self.combatants)
+
+            for combatant in self.initiative_order:
+                if not combatant.alive or combatant.id in self._fled:
+                    continue
+                self.take_turn(combatant)
+                if self.result is None:
+                    self._check_end()
+                if self.result is not None:
+                    break
+
+        for combatant in self.combatants:
+            combatant.sync()
+        return self.result
+
+    def take_turn(self, actor: Combatant):
+        """Ask the actor's policy for an action and resolve it"""
+        self.emit(EventType.TURN_START, actor)
+        policy = self.player_policy if self.is_player(actor) else self.enemy_policy
+        action = policy.choose_action(self, actor)
+
+        if action.type == ActionType.ATTACK:
+            self.attack(actor, action.target)
+        elif action.type == ActionType.SPECIAL_ATTACK:
+            self.special_attack(actor, action.target)
+        elif action.type == ActionType.CAST_SPELL:
+            self.cast_spell(actor, action.spell, action.target)
+        elif action.type == ActionType.USE_ITEM:
+            self.use_item(actor, action.item)
+        elif action.type == ActionType.FLEE:
+            self.flee(actor)
+
+    def attack(self, attacker: Combatant, target: Optional[Combatant] = None) -> Tuple[bool, int]:
+        """Resolve an attack, defaulting to the first living opponent"""
+        if target is None or not target.alive:
+            target = self.opponents_of(attacker)[0]
+
+        hit, damage, attack_roll = resolve_attack(attacker, target, self.rng)
+        self.emit(EventType.ATTACK, attacker, target, attack_roll, armor_class=target.armor_class)
+        if hit:
+            self.emit(EventType.HIT, attacker, target, damage)
+            self.apply_damage(target, damage, attacker)
+        else:
+            self.emit(EventType.MISS, attacker, target)
+        return hit, damage
+
+    def special_uses_left(self, combatant: Combatant) -> int:
+        """Remaining uses of a monster's special_attack (0 if it has none)"""
+        special = combatant.special_attack
+        if special is None:
+            return 0
+        return special.uses - self._special_uses.get(combatant.id, 0)
+
+    def special_attack(self, attacker: Combatant, target: Optional[Combatant] = None) -> Tuple[bool, int]:
+        """Use the attacker's special_attack, or a normal attack once it is used up"""
+        if self.special_uses_left(attacker) <= 0:
+            return self.attack(attacker, target)
+        if target is None or not target.alive:
+            target = self.opponents_of(attacker)[0]
+
+        special = attacker.special_attack
+        self._special_uses[attacker.id] = self._special_uses.get(attacker.id, 0) + 1
+        attack_roll = D20.roll(self.rng) + attacker.attack_bonus + special.attack_bonus
+        self.emit(EventType.SPECIAL_ATTACK, attacker, target, attack_roll,
+                  ability=special.name, armor_class=target.armor_class)
+        if attack_roll < target.armor_class:
+            self.emit(EventType.MISS, attacker, target)
+            return False, 0
+
+        damage = max(0, special.damage.roll(self.rng) + special.damage_bonus)
+        self.emit(EventType.HIT, attacker, target, damage)
+        self.apply_damage(target, damage, attacker)
+        return True, damage
+
+    def apply_damage(self, target: Combatant, amount: int, source: Optional[Combatant] = None):
+        """Reduce a combatant's hit points"""
+        target.current_hp = max(0, target.current_hp - amount)
+        self.update_status(target)
+        if target.current_hp == 0:
+            self.emit(EventType.DOWNED, source, target, amount)
+        else:
+            self.emit(EventType.DAMAGE, source, target, amount)
+
+    def cast_spell(self, caster: Combatant, spell_name: str, target: Optional[Combatant] = None):
+        """Cast a spell, falling back to an attack if it fails"""
+        from spell_effects import compiled_spells
+        from spells import cast_spell
+
+        spell = compiled_spells.get(spell_name)
+        if spell is not None and spell.area_effect:
+            self.cast_area_spell(caster, spell_name, spell.effect.requires_target)
+            return
+
+        # The spell rules work on dicts, so hand over and reload the hit points
+        involved = [caster] if target is None or target is caster else [caster, target]
+        for combatant in involved:
+            combatant.sync()
+        success, message, effect_value = cast_spell(
+            caster.source, spell_name, target.source if target is not None else None, self.rng)
+        for combatant in involved:
+            combatant.current_hp = combatant.source['current_hp']
+            self.update_status(combatant)
+
+        if success:
+            self.emit(EventType.SPELL, caster, target, effect_value, spell=spell_name, message=message)
+        else:
+            self.emit(EventType.SPELL_FAILED, caster, target, spell=spell_name, message=message)
+            self.attack(caster)
+
+    def cast_area_spell(self, caster: Combatant, spell_name: str, hostile: bool):
+        """Cast an area spell on every living opponent (or ally) at once, as one event"""
+        from spells import cast_area_spell
+
+        targets = self.opponents_of(caster) if hostile else self.allies_of(caster)
+        involved = targets if caster in targets else [caster] + targets
+        for combatant in involved:
+            combatant.sync()
+        success, message, total, values = cast_area_spell(
+            caster.source, spell_name, [target.source for target in targets], self.rng)
+        for combatant in involved:
+            combatant.current_hp = combatant.source['current_hp']
+            self.update_status(combatant)
+
+        if success:
+            self.emit(EventType.SPELL, caster, None, total, spell=spell_name, message=message,
+                      targets=[target.name for target in targets], values=values)
+        else:
+            self.emit(EventType.SPELL_FAILED, caster, None, spell=spell_name, message=message)
+            self.attack(caster)
+
+    def use_item(self, user: Combatant, item: str):
+        """Use an item from the inventory, falling back to an attack"""
+        inventory = user.inventory
+        if item != "Potion of Healing" or inventory.get(item, 0) <= 0:
+            self.attack(user)
+            return
+
+        heal_amount = HEALING_POTION.roll(self.rng)  # Standard D&D healing potion
+        old_hp = user.current_hp
+        user.current_hp = min(user.max_hp, user.current_hp + heal_amount)
+        self.update_status(user)
+        inventory[item] -= 1
+        if inventory[item] <= 0:
+            del inventory[item]
+        self.emit(EventType.ITEM, user, user, user.current_hp - old_hp, item=item)
+
+    def flee(self, actor: Combatant) -> bool:
+        """Attempt to flee; a party member escaping ends the combat, a monster just leaves it"""
+        flee_roll = D20.roll(self.rng)
+        if flee_roll >= FLEE_DC:
+            self.emit(EventType.FLEE, actor, value=flee_roll)
+            if self.is_player(actor):
+                self.result = CombatResult("fled", self.round)
+            else:
+                self._fled[actor.id] = actor
+                self._alive[ENEMIES].pop(actor.id, None)
+            return True
+        self.emit(EventType.FLEE_FAILED, actor, value=flee_roll)
+        return False
+
+    def _check_end(self):
+        """Finish the combat if one side has no one left standing"""
+        if not self._alive[PARTY]:
+            self.result = CombatResult("defeat", self.round)
+            self.emit(EventType.DEFEAT)
+        elif not self._alive[ENEMIES]:
+            # Monsters that fled count as overcome
+            xp = sum(e.xp_value for e in self.enemies)
+            self.result = CombatResult("victory", self.round, xp)
+            self.emit(EventType.VICTORY, value=xp)
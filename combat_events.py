@@ -0,0 +1,131 @@
+"""
+Combat events for D&D 3.5e RPG
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_LOG_SIZE = 200
+
+
+class EventType(Enum):
+    """Kinds of combat events emitted by the engine"""
+    COMBAT_START = "combat_start"
+    INITIATIVE = "initiative"
+    ROUND_START = "round_start"
+    TURN_START = "turn_start"
+    ATTACK = "attack"
+    SPECIAL_ATTACK = "special_attack"
+    HIT = "hit"
+    MISS = "miss"
+    DAMAGE = "damage"
+    DOWNED = "downed"
+    SPELL = "spell"
+    SPELL_FAILED = "spell_failed"
+    ITEM = "item"
+    FLEE = "flee"
+    FLEE_FAILED = "flee_failed"
+    VICTORY = "victory"
+    DEFEAT = "defeat"
+
+
+@dataclass
+class CombatEvent:
+    """Something that happened during combat"""
+    type: EventType
+    round: int
+    actor: Optional[Any] = None  # Combatant
+    target: Optional[Any] = None  # Combatant
+    value: Optional[int] = None
+    detail: Dict[str, Any] = field(default_factory=dict)
+
+
+Subscriber = Callable[[CombatEvent], None]
+
+
+class CombatLog:
+    """Bounded log of combat events that notifies subscribers"""
+
+    def __init__(self, capacity: int = DEFAULT_LOG_SIZE, subscribers: Optional[List[Subscriber]] = None):
+        self.events: deque = deque(maxlen=capacity)
+        self.subscribers: List[Subscriber] = list(subscribers or [])
+        self.total = 0  # Events seen, including those pushed out of the buffer
+
+    @property
+    def capacity(self) -> int:
+        return self.events.maxlen
+
+    @property
+    def active(self) -> bool:
+        """False for a zero-size log without subscribers, which needs no events at all"""
+        return bool(self.events.maxlen) or bool(self.subscribers)
+
+    def subscribe(self, subscriber: Subscriber) -> Subscriber:
+        """Add a subscriber and return it"""
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a subscriber if present"""
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+
+    def append(self, event: CombatEvent):
+        """Store an event, dropping the oldest when full, and notify subscribers"""
+        self.events.append(event)
+        self.total += 1
+        for subscriber in self.subscribers:
+            subscriber(event)
+
+    def window(self, count: int) -> List[CombatEvent]:
+        """The most recent count events, oldest first"""
+        if count <= 0:
+            return []
+        size = len(self.events)
+        if count >= size:
+            return list(self.events)
+        return [self.events[i] for i in range(size - count, size)]
+
+    def clear(self):
+        """Forget stored events (subscribers are kept)"""
+        self.events.clear()
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[CombatEvent]:
+        return iter(self.events)
+
+
+def _name(combatant) -> str:
+    return combatant.name if combatant is not None else "?"
+
+
+_FORMATS: Dict[EventType, Callable[[CombatEvent], str]] = {
+    EventType.COMBAT_START: lambda e: "Combat begins!",
+    EventType.INITIATIVE: lambda e: f"{_name(e.actor)} initiative: {e.value}",
+    EventType.ROUND_START: lambda e: f"=== Round {e.round} ===",
+    EventType.TURN_START: lambda e: f"{_name(e.actor)}'s turn",
+    EventType.ATTACK: lambda e: f"{_name(e.actor)} attacks {_name(e.target)}: "
+                                f"{e.value} vs AC {e.detail.get('armor_class', '?')}",
+    EventType.SPECIAL_ATTACK: lambda e: f"{_name(e.actor)} uses {e.detail.get('ability')} on {_name(e.target)}: "
+                                        f"{e.value} vs AC {e.detail.get('armor_class', '?')}",
+    EventType.HIT: lambda e: f"Hit! Damage: {e.value}",
+    EventType.MISS: lambda e: "Miss!",
+    EventType.DAMAGE: lambda e: f"{_name(e.target)} takes {e.value} damage",
+    EventType.DOWNED: lambda e: f"{_name(e.target)} is unconscious!",
+    EventType.SPELL: lambda e: e.detail.get('message') or f"{_name(e.actor)} casts {e.detail.get('spell')}",
+    EventType.SPELL_FAILED: lambda e: e.detail.get('message') or f"{e.detail.get('spell')} failed",
+    EventType.ITEM: lambda e: f"{_name(e.actor)} uses a {e.detail.get('item')} (+{e.value} HP)",
+    EventType.FLEE: lambda e: f"{_name(e.actor)} flees from combat",
+    EventType.FLEE_FAILED: lambda e: f"{_name(e.actor)} fails to flee",
+    EventType.VICTORY: lambda e: f"Victory! Gained {e.value} experience points",
+    EventType.DEFEAT: lambda e: "Defeated!",
+}
+
+
+def format_event(event: CombatEvent) -> str:
+    """One line of plain text describing an event"""
+    return _FORMATS[event.type](event)
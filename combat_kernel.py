@@ -0,0 +1,177 @@
+"""
+Vectorized combat kernel for D&D 3.5e RPG
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from combatant import Combatant
+from data_loader import data_loader
+from dice import DiceExpression
+from rng import rng_service, ATTACKS, ENCOUNTERS
+
+VICTORY = 1
+DEFEAT = -1
+STALEMATE = 0
+
+MonsterGroups = Union[Sequence[str], Sequence[Sequence[str]]]
+
+
+@dataclass
+class BattleResults:
+    """Per-battle outcomes of a kernel run"""
+    outcome: np.ndarray  # VICTORY, DEFEAT or STALEMATE per battle
+    rounds: np.ndarray
+    hp_remaining: np.ndarray
+
+    def to_report(self, confidence: float = 0.95):
+        """Summarize as a simulation.SimulationReport"""
+        from simulation import SimulationReport, wilson_interval
+
+        trials = len(self.outcome)
+        wins = int(np.count_nonzero(self.outcome == VICTORY))
+        defeats = int(np.count_nonzero(self.outcome == DEFEAT))
+        mean_rounds, rounds_ci = _mean_interval(self.rounds, confidence)
+        mean_hp, hp_ci = _mean_interval(self.hp_remaining, confidence)
+        return SimulationReport(
+            trials=trials,
+            wins=wins,
+            defeats=defeats,
+            fled=0,
+            win_rate=wins / trials if trials else 0.0,
+            win_rate_ci=wilson_interval(wins, trials, confidence),
+            death_probability=defeats / trials if trials else 0.0,
+            death_probability_ci=wilson_interval(defeats, trials, confidence),
+            mean_rounds=mean_rounds,
+            mean_rounds_ci=rounds_ci,
+            mean_hp_remaining=mean_hp,
+            mean_hp_remaining_ci=hp_ci,
+        )
+
+
+def _mean_interval(values: np.ndarray, confidence: float) -> Tuple[float, Tuple[float, float]]:
+    """Mean with a normal-approximation confidence interval"""
+    from statistics import NormalDist
+
+    if len(values) < 2:
+        mean = float(values.mean()) if len(values) else 0.0
+        return mean, (mean, mean)
+    mean = float(values.mean())
+    margin = NormalDist().inv_cdf(0.5 + confidence / 2) * float(values.std(ddof=1)) / np.sqrt(len(values))
+    return mean, (mean - margin, mean + margin)
+
+
+def _simple_damage(damage: DiceExpression, bonus: int = 0) -> Tuple[int, int, int]:
+    """Split an 'NdS+M' damage expression into (count, sides, bonus)"""
+    if len(damage.terms) != 1 or not damage.terms[0].is_plain or damage.terms[0].sign < 0:
+        raise ValueError(f"Combat kernel only supports NdS+M damage, got {damage.text!r}")
+    term = damage.terms[0]
+    return term.count, term.sides, damage.modifier + bonus
+
+
+def _stats_row(combatant: Dict[str, Any]) -> Tuple[int, int, int, int, int, int, int]:
+    """(hp, ac, attack, initiative, dice count, dice sides, damage bonus) for a combatant"""
+    record = Combatant.from_dict(combatant)
+    return (record.current_hp, record.armor_class, record.attack_bonus,
+            record.initiative_bonus) + _simple_damage(record.damage, record.damage_bonus)
+
+
+def _group_matrix(monster_groups: Optional[MonsterGroups], battles: int, level: int,
+                  monster_names: List[str]) -> np.ndarray:
+    """(battles, K) matrix of monster indices into monster_names, -1 for empty slots"""
+    index = {name: i for i, name in enumerate(monster_names)}
+    if monster_groups is not None and monster_groups and isinstance(monster_groups[0], str):
+        row = np.array([index[name] for name in monster_groups], dtype=np.int64)
+        return np.broadcast_to(row, (battles, len(row))).copy()
+
+    if monster_groups is None:
+        from encounters import create_random_encounter
+
+        rng = rng_service.stream(ENCOUNTERS)
+        monster_groups = [[m['name'] for m in create_random_encounter(level, rng)] for _ in range(battles)]
+    elif len(monster_groups) != battles:
+        raise ValueError("Need one monster group per battle")
+
+    width = max(len(group) for group in monster_groups)
+    matrix = np.full((battles, width), -1, dtype=np.int64)
+    for b, group in enumerate(monster_groups):
+        matrix[b, :len(group)] = [index[name] for name in group]
+    return matrix
+
+
+def simulate_battles(character: Dict[str, Any], monster_groups: Optional[MonsterGroups] = None,
+                     battles: int = 10000, generator: Optional[np.random.Generator] = None,
+                     target: str = "weakest", max_rounds: int = 100) -> BattleResults:
+    """
+    Fight `battles` independent battles of character against monster_groups.
+
+    monster_groups is either one group used for every battle (["Goblin", "Orc"]),
+    one group per battle, or None to draw a random encounter for each battle.
+    target is "weakest" or "first" and picks the character's targeting rule.
+    """
+    generator = generator if generator is not None else rng_service.generator(ATTACKS)
+    monsters = data_loader.monsters
+    monster_names = list(monsters)
+    groups = _group_matrix(monster_groups, battles, character['level'], monster_names)
+    n, k = groups.shape
+    slots = k + 1
+
+    # Stat table: row 0 is the character, rows 1.. the monster types, last row an empty slot
+    table = np.array([_stats_row(character)]
+                     + [_stats_row(monsters[name]) for name in monster_names]
+                     + [(0, 0, 0, 0, 1, 1, 0)], dtype=np.int64)
+    rows = np.concatenate([np.zeros((n, 1), dtype=np.int64),
+                           np.where(groups >= 0, groups + 1, len(table) - 1)], axis=1)
+    stats = table[rows]  # (n, slots, 7)
+    hp = stats[:, :, 0].copy()
+    ac, attack, init_bonus = stats[:, :, 1], stats[:, :, 2], stats[:, :, 3]
+    dice_count, dice_sides, damage_bonus = stats[:, :, 4], stats[:, :, 5], stats[:, :, 6]
+    max_dice = int(dice_count.max())
+    present = np.concatenate([np.ones((n, 1), dtype=bool), groups >= 0], axis=1)
+
+    # Initiative: highest roll first, initiative bonus breaks ties, then slot order
+    initiative = generator.integers(1, 21, size=(n, slots)) + init_bonus
+    key = np.where(present, initiative * 256 + (init_bonus + 128), np.iinfo(np.int64).min)
+    order = np.argsort(-key, axis=1, kind="stable")
+
+    outcome = np.full(n, STALEMATE, dtype=np.int64)
+    rounds = np.full(n, max_rounds, dtype=np.int64)
+    running = np.ones(n, dtype=bool)
+    battle = np.arange(n)
+    dice_index = np.arange(max_dice)
+
+    for round_num in range(1, max_rounds + 1):
+        for turn in range(slots):
+            actor = order[:, turn]
+            acting = running & (hp[battle, actor] > 0)
+            if not acting.any():
+                continue
+
+            # Monsters attack the character; the character picks a monster
+            monster_hp = np.where(hp[:, 1:] > 0, hp[:, 1:], np.iinfo(np.int64).max)
+            if target == "weakest":
+                pick = np.argmin(monster_hp, axis=1) + 1
+            else:
+                pick = np.argmax(hp[:, 1:] > 0, axis=1) + 1
+            victim = np.where(actor == 0, pick, 0)
+
+            roll = generator.integers(1, 21, size=n) + attack[battle, actor]
+            hit = acting & (roll >= ac[battle, victim])
+
+            sides = dice_sides[battle, actor]
+            dice = generator.integers(1, sides[:, None] + 1, size=(n, max_dice))
+            damage = np.where(dice_index < dice_count[battle, actor][:, None], dice, 0).sum(axis=1)
+            damage = np.maximum(damage + damage_bonus[battle, actor], 0)
+            hp[battle, victim] = np.where(hit, np.maximum(hp[battle, victim] - damage, 0), hp[battle, victim])
+
+            defeated = running & (hp[:, 0] <= 0)
+            victorious = running & ~defeated & ~(hp[:, 1:] > 0).any(axis=1)
+            outcome[defeated] = DEFEAT
+            outcome[victorious] = VICTORY
+            finished = defeated | victorious
+            rounds[finished] = round_num
+            running &= ~finished
+
+        if not running.any():
+            break
+
+    return BattleResults(outcome, rounds, hp[:, 0].copy())
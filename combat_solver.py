@@ -0,0 +1,174 @@
+"""
+Exact Markov-chain combat solver for D&D 3.5e RPG
+"""
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from combat_engine import FLEE_DC
+from combatant import Combatant
+from data_loader import data_loader
+from probability import dice_distribution, hit_chance
+
+FLEE_CHANCE = (21 - FLEE_DC) / 20.0
+
+# Value vector layout: win, loss, flee, stalemate, expected rounds
+WIN, LOSS, FLEE, STALEMATE, ROUNDS = range(5)
+
+
+@dataclass
+class SolverResult:
+    """Exact outcome probabilities of a fight"""
+    win: float
+    loss: float
+    flee: float
+    stalemate: float
+    expected_rounds: float
+
+
+def _damage_outcomes(expression, bonus: int) -> List[Tuple[int, float]]:
+    """Damage values and their probabilities, never below 0"""
+    return list((dice_distribution(expression) + bonus).clamp(0).outcomes())
+
+
+def _acts_before(monster_bonus: int, player_bonus: int, player_roll: int) -> float:
+    """Probability a monster's initiative sorts ahead of the character's given the character's roll"""
+    player_key = (player_roll + player_bonus, player_bonus)
+    # Equal keys keep list order, and the character is listed first
+    return sum(1 for roll in range(1, 21) if (roll + monster_bonus, monster_bonus) > player_key) / 20.0
+
+
+def _initiative_splits(player_bonus: int, monster_bonuses: Sequence[int]) -> Dict[Tuple[bool, ...], float]:
+    """Probability of each set of monsters acting before the character"""
+    splits: Dict[Tuple[bool, ...], float] = {}
+    for player_roll in range(1, 21):
+        before = [_acts_before(b, player_bonus, player_roll) for b in monster_bonuses]
+        for split in product((True, False), repeat=len(monster_bonuses)):
+            p = 1 / 20.0
+            for first, chance in zip(split, before):
+                p *= chance if first else 1 - chance
+            if p:
+                splits[split] = splits.get(split, 0.0) + p
+    return splits
+
+
+class _Solver:
+    """Solves one fight for one fixed turn order"""
+
+    def __init__(self, order: Tuple[int, ...], player_hit: List[float], player_damage,
+                 monster_hit: List[float], monster_damage: List[List[Tuple[int, float]]],
+                 target: str, flee_below_hp: Optional[int]):
+        self.order = order
+        self.player_hit = player_hit  # Chance to hit each monster (index 1..k)
+        self.player_damage = player_damage
+        self.monster_hit = monster_hit
+        self.monster_damage = monster_damage
+        self.target = target
+        self.flee_below_hp = flee_below_hp
+        self.memo: Dict[Tuple[int, ...], List[List[float]]] = {}
+
+    def _pick_target(self, hps: Tuple[int, ...]) -> int:
+        alive = [i for i in range(1, len(hps)) if hps[i] > 0]
+        if self.target == "weakest":
+            return min(alive, key=lambda i: hps[i])
+        return alive[0]
+
+    def _turn(self, t: int, hps: Tuple[int, ...]):
+        """(stay probability, leaving contribution vector) for turn t at hps"""
+        actor = self.order[t]
+        contribution = [0.0] * 5
+        if hps[actor] == 0:
+            return 1.0, contribution
+
+        if actor == 0:
+            if self.flee_below_hp is not None and hps[0] < self.flee_below_hp:
+                contribution[FLEE] = FLEE_CHANCE
+                return 1 - FLEE_CHANCE, contribution
+            victim = self._pick_target(hps)
+            hit, damage = self.player_hit[victim], self.player_damage
+        else:
+            victim = 0
+            hit, damage = self.monster_hit[actor], self.monster_damage[actor]
+
+        stay = 1 - hit
+        next_t = (t + 1) % len(self.order)
+        for amount, p in damage:
+            p *= hit
+            new_hp = max(0, hps[victim] - amount)
+            if new_hp == hps[victim]:
+                stay += p
+                continue
+            new_hps = hps[:victim] + (new_hp,) + hps[victim + 1:]
+            if new_hps[0] == 0:
+                contribution[LOSS] += p
+            elif not any(new_hps[1:]):
+                contribution[WIN] += p
+            else:
+                value = self.solve(new_hps)[next_t]
+                for i in range(5):
+                    contribution[i] += p * value[i]
+        return stay, contribution
+
+    def solve(self, hps: Tuple[int, ...]) -> List[List[float]]:
+        """Value vectors for every turn position at hit points hps"""
+        cached = self.memo.get(hps)
+        if cached is not None:
+            return cached
+
+        turns = len(self.order)
+        steps = [self._turn(t, hps) for t in range(turns)]
+        # A new round starts at turn 0
+        steps[0][1][ROUNDS] += 1.0
+
+        # Unroll V_t = a_t + q_t * V_{t+1} once around the loop to get V_0
+        total = [0.0] * 5
+        carry = 1.0
+        for stay, contribution in steps:
+            for i in range(5):
+                total[i] += carry * contribution[i]
+            carry *= stay
+
+        values = [None] * turns
+        if carry >= 1.0 - 1e-12:
+            # Nothing can change: nobody can hit and nobody flees
+            values[0] = [0.0, 0.0, 0.0, 1.0, float("inf")]
+        else:
+            values[0] = [x / (1 - carry) for x in total]
+        for t in range(turns - 1, 0, -1):
+            stay, contribution = steps[t]
+            following = values[(t + 1) % turns]
+            values[t] = [contribution[i] + stay * following[i] for i in range(5)]
+
+        self.memo[hps] = values
+        return values
+
+
+def solve_combat(character: Dict[str, Any], enemies: Sequence[Union[str, Dict[str, Any]]],
+                 target: str = "weakest", flee_below_hp: Optional[int] = None) -> SolverResult:
+    """
+    Exact win/loss/flee probabilities and expected rounds of a fight.
+
+    enemies are monster dicts (their current_hp is used) or monster type names.
+    The character tries to flee at the start of any turn where its hit points
+    are below flee_below_hp.
+    """
+    hero = Combatant.from_dict(character)
+    monsters = [Combatant.from_dict(data_loader.monsters[e] if isinstance(e, str) else e) for e in enemies]
+    start = (hero.current_hp,) + tuple(m.current_hp for m in monsters)
+
+    player_hit = [0.0] + [hit_chance(hero.attack_bonus, m.armor_class) for m in monsters]
+    player_damage = _damage_outcomes(hero.damage, hero.damage_bonus)
+    monster_hit = [0.0] + [hit_chance(m.attack_bonus, hero.armor_class) for m in monsters]
+    monster_damage = [[]] + [_damage_outcomes(m.damage, m.damage_bonus) for m in monsters]
+
+    splits = _initiative_splits(hero.initiative_bonus, [m.initiative_bonus for m in monsters])
+    totals = [0.0] * 5
+    for split, weight in splits.items():
+        before = tuple(i + 1 for i, first in enumerate(split) if first)
+        after = tuple(i + 1 for i, first in enumerate(split) if not first)
+        solver = _Solver(before + (0,) + after, player_hit, player_damage,
+                         monster_hit, monster_damage, target, flee_below_hp)
+        value = solver.solve(start)[0]
+        for i in range(5):
+            totals[i] += weight * value[i]
+
+    return SolverResult(totals[WIN], totals[LOSS], totals[FLEE], totals[STALEMATE], totals[ROUNDS])
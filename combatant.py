@@ -0,0 +1,114 @@
+"""
+Compact combatant records for D&D 3.5e RPG
+"""
+import itertools
+from typing import Any, Dict, Optional
+from character_rules import get_attack_bonus, get_damage_bonus
+from data_schema import MonsterDef, SpecialAttackDef
+from dice import DiceExpression, compile_dice
+from monster_templates import MonsterInstance
+
+# Dice used on every turn, compiled once
+D20 = compile_dice("1d20")
+DEFAULT_WEAPON_DAMAGE = compile_dice("1d8")
+HEALING_POTION = compile_dice("2d4+2")
+
+_combatant_ids = itertools.count(1)
+
+
+def new_combatant_id() -> int:
+    """Allocate a process-unique combatant ID"""
+    return next(_combatant_ids)
+
+
+class Combatant:
+    """A character or monster as seen by the combat rules"""
+
+    __slots__ = (
+        'id', 'name', 'is_monster', 'max_hp', 'current_hp', 'armor_class',
+        'initiative_bonus', 'attack_bonus', 'damage', 'damage_bonus', 'xp_value', 'behavior',
+        'special_attack', 'source'
+    )
+
+    def __init__(self, id: int, name: str, is_monster: bool, max_hp: int, current_hp: int,
+                 armor_class: int, initiative_bonus: int, attack_bonus: int,
+                 damage: DiceExpression, damage_bonus: int = 0, xp_value: int = 0,
+                 behavior: Optional[str] = None, special_attack: Optional[SpecialAttackDef] = None,
+                 source: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.name = name
+        self.is_monster = is_monster
+        self.max_hp = max_hp
+        self.current_hp = current_hp
+        self.armor_class = armor_class
+        self.initiative_bonus = initiative_bonus
+        self.attack_bonus = attack_bonus
+        self.damage = damage
+        self.damage_bonus = damage_bonus
+        self.xp_value = xp_value
+        self.behavior = behavior  # Monster AI behavior name, see monster_ai
+        self.special_attack = special_attack
+        self.source = source if source is not None else {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Combatant':
+        """Build a record from a character or monster dict"""
+        if 'attack_bonus' in data:  # Monster
+            monster = data.record if isinstance(data, MonsterInstance) else MonsterDef.parse(data['name'], data)
+            return cls(
+                id=data.get('id') or new_combatant_id(),
+                name=data['name'],
+                is_monster=True,
+                max_hp=monster.max_hp,
+                current_hp=data.get('current_hp', monster.max_hp),
+                armor_class=monster.armor_class,
+                initiative_bonus=monster.initiative_bonus,
+                attack_bonus=monster.attack_bonus,
+                damage=monster.damage,
+                damage_bonus=monster.damage_bonus,
+                xp_value=monster.xp_value,
+                behavior=monster.behavior,
+                special_attack=monster.special_attack,
+                source=data,
+            )
+
+        # Player character - simplified weapon damage
+        return cls(
+            id=data.get('id') or new_combatant_id(),
+            name=data['name'],
+            is_monster=False,
+            max_hp=data['max_hp'],
+            current_hp=data.get('current_hp', data['max_hp']),
+            armor_class=data['armor_class'],
+            initiative_bonus=data['initiative_bonus'],
+            attack_bonus=get_attack_bonus(data),
+            damage=DEFAULT_WEAPON_DAMAGE,
+            damage_bonus=get_damage_bonus(data),
+            source=data,
+        )
+
+    @property
+    def alive(self) -> bool:
+        """True while the combatant has hit points left"""
+        return self.current_hp > 0
+
+    @property
+    def inventory(self) -> Dict[str, int]:
+        """The inventory of the underlying character (empty for monsters)"""
+        return self.source.get('inventory', {})
+
+    def sync(self):
+        """Write the mutable combat state back to the source dict"""
+        if self.is_monster:
+            self.source['id'] = self.id  # Characters get a fresh ID each combat instead
+        self.source['current_hp'] = self.current_hp
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of the source dict with the current combat state"""
+        data = dict(self.source)
+        data['id'] = self.id
+        data['current_hp'] = self.current_hp
+        return data
+
+    def __repr__(self) -> str:
+        return f"Combatant({self.name!r}, id={self.id}, hp={self.current_hp}/{self.max_hp})"
@@ -4,7 +4,8 @@ Command handler for D&D 3.5e RPG
 from typing import Dict, Any, Callable, List
 from utils import console, print_error, print_character_sheet, print_inventory
 from models import Character
-from spells import display_spell_list
+from data_loader import data_loader
+from spells import display_spell_list, refresh_spell_slots
 
 class CommandHandler:
     """Handles player commands using the command pattern"""
@@ -21,6 +22,9 @@ class CommandHandler:
             'move': self._handle_move,
             'character': self._handle_character,
             'spells': self._handle_spells,
+            'rest': self._handle_rest,
+            'lookup': self._handle_lookup,
+            'search': self._handle_search,
             'inventory': self._handle_inventory,
             'map': self._handle_map,
             'save': self._handle_save,
@@ -74,7 +78,7 @@ class CommandHandler:
         if enemies:
             # Convert enemies back to Monster objects for combat
             from combat import start_combat
-            updated_character = start_combat(character.to_dict(), enemies)
+            updated_character = start_combat(character.to_dict(), enemies, self.dm)
             character = Character.from_dict(updated_character)
             self.game_state.update_character(character.to_dict())
             
@@ -103,7 +107,7 @@ class CommandHandler:
             if enemies:
                 # Convert enemies back to Monster objects for combat
                 from combat import start_combat
-                updated_character = start_combat(character.to_dict(), enemies)
+                updated_character = start_combat(character.to_dict(), enemies, self.dm)
                 character = Character.from_dict(updated_character)
                 self.game_state.update_character(character.to_dict())
                 
@@ -126,6 +130,60 @@ class CommandHandler:
             console.print("[yellow]You are not a spellcaster.[/yellow]")
         return True
     
+    def _handle_rest(self, character: Character, dungeon, args) -> bool:
+        """Handle 'rest' command"""
+        character_data = character.to_dict()
+        refresh_spell_slots(character_data)
+        self.game_state.update_character(character_data)
+        console.print("[green]You rest for a while and regain your spells.[/green]")
+        return True
+    
+    def _handle_lookup(self, character: Character, dungeon, args) -> bool:
+        """Handle 'lookup' command"""
+        if not args:
+            console.print("[yellow]Usage: lookup <spell, monster, race or class name>[/yellow]")
+            return True
+        
+        query = " ".join(args)
+        index = data_loader.search_index
+        result = index.lookup(query)
+        if result is None:
+            console.print(f"[yellow]Nothing found for '{query}'.[/yellow]")
+            return True
+        
+        entry = index.entry(result.kind, result.name)
+        console.print(f"\n[bold cyan]{result.name}[/bold cyan] [dim]({result.kind})[/dim]")
+        for key, value in entry.items():
+            if key in ("name", "description"):
+                continue
+            if isinstance(value, dict):
+                value = ", ".join(f"{k}: {v}" for k, v in value.items())
+            elif isinstance(value, list):
+                value = ", ".join(str(v) for v in value)
+            if value not in ("", None):
+                console.print(f"[yellow]{key.replace('_', ' ').title()}:[/yellow] {value}")
+        if entry.get("description"):
+            console.print(f"\n{entry['description']}")
+        return True
+    
+    def _handle_search(self, character: Character, dungeon, args) -> bool:
+        """Handle 'search' command"""
+        if not args:
+            console.print("[yellow]Usage: search <words>[/yellow]")
+            return True
+        
+        query = " ".join(args)
+        results = data_loader.search_index.search(query)
+        if not results:
+            console.print(f"[yellow]Nothing found for '{query}'.[/yellow]")
+            return True
+        
+        console.print(f"\n[bold cyan]Results for '{query}':[/bold cyan]")
+        for result in results:
+            console.print(f"- {result.name} [dim]({result.kind})[/dim]")
+        console.print("[dim]Type 'lookup <name>' for details.[/dim]")
+        return True
+    
     def _handle_inventory(self, character: Character, dungeon, args) -> bool:
         """Handle 'inventory' command"""
         print_inventory(character.inventory)
@@ -201,6 +259,9 @@ class CommandHandler:
         console.print("- attack [target]: Attack an enemy")
         console.print("- cast [spell]: Cast a spell (if you're a spellcaster)")
         console.print("- spells: View your spell list (spellcasters only)")
+        console.print("- rest: Rest to regain your spell slots")
+        console.print("- lookup <name>: Show a spell, monster, race or class")
+        console.print("- search <words>: Find spells, monsters, races and classes by description")
         console.print("- inventory: Check your inventory")
         console.print("- character: View your character sheet")
         console.print("- map: Show dungeon map")
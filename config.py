@@ -20,7 +20,10 @@ class GameConfig:
                 "version": "1.0.0",
                 "save_file": "save_game.json",
                 "auto_save": True,
-                "debug_mode": False
+                "debug_mode": False,
+                "seed": None,
+                "watch_data": False,  # Reload data files when they change (for content editing)
+                "watch_interval": 1.0
             },
             "character": {
                 "starting_gold": 100,
@@ -34,21 +37,25 @@ class GameConfig:
                 "critical_hit_threshold": 20,
                 "critical_hit_multiplier": 2,
                 "death_threshold": -10,
-                "stabilization_check": "constitution"
+                "stabilization_check": "constitution",
+                "show_advice": True  # Show the advisor's recommended action in the combat menu
             },
             "dungeon": {
                 "min_rooms": 5,
                 "max_rooms": 15,
                 "boss_room_level": 3,
                 "treasure_chance": 0.3,
-                "encounter_chance": 0.4
+                "encounter_chance": 0.4,
+                "room_encounter_chance": {}  # Room type -> chance, overrides dungeon.ROOM_TYPES
             },
             "ai": {
                 "enabled": True,
                 "model": "gpt-3.5-turbo",
                 "max_tokens": 150,
                 "temperature": 0.7,
-                "fallback_narration": True
+                "fallback_narration": True,
+                "narration_mode": "per_round",  # per_round, per_action or off
+                "narration_timeout": 2.0  # Seconds before a round narration is skipped
             },
             "ui": {
                 "colors_enabled": True,
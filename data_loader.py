@@ -1,59 +1,205 @@
 """
 Data loader for D&D 3.5e RPG
 """
+import gc
+import hashlib
 import json
 import os
-from typing import Dict, Any, List, Optional
+import pickle
+import threading
+from collections.abc import Mapping
+from typing import Callable, Dict, Any, FrozenSet, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
 from pathlib import Path
+from data_schema import ClassDef, MonsterDef, RaceDef, SpellDef, compile_records
+from search_index import SearchIndex
+
+CACHE_DIR = ".cache"
+CACHE_FORMAT = 2  # Bump when the snapshot layout changes
+CHECKSUM_SIZE = 32  # SHA-256 of the pickled snapshot, written before it
+SNAPSHOT_FIELDS = {"mtime_ns": int, "size": int, "sha256": str, "data": dict}
+
+# Raw entries of a file and the records compiled from them
+LoadedData = Tuple[Dict[str, Any], Dict[str, Any]]
+
+T = TypeVar("T")
+
+# Data set name -> (file, record class)
+DATA_FILES = {
+    "races": ("races.json", RaceDef),
+    "classes": ("classes.json", ClassDef),
+    "monsters": ("monsters.json", MonsterDef),
+    "spells": ("spells.json", SpellDef)
+}
 
 
 class DataLoader:
     """Loads game data from JSON files"""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", use_cache: bool = True):
         self.data_dir = Path(data_dir)
-        self._races = None
-        self._classes = None
-        self._monsters = None
-        self._spells = None
+        self.cache_dir = self.data_dir / CACHE_DIR
+        self.use_cache = use_cache
+        self._loaded: Dict[str, LoadedData] = {}  # Data set name -> (raw entries, records), swapped as a pair
+        self._search_index = SearchIndex()
+        self._search_index_stale = True
+        self._reload_lock = threading.Lock()
+        self._reload_listeners: List[Tuple[Callable[[], None], Optional[FrozenSet[str]]]] = []
     
-    def _load_json_file(self, filename: str) -> Dict[str, Any]:
-        """Load a JSON file from the data directory"""
+    def _read_data_file(self, filename: str) -> Dict[str, Any]:
+        """Parse a JSON file from the data directory, through the snapshot cache"""
         file_path = self.data_dir / filename
-        try:
+        if not self.use_cache:
             with open(file_path, 'r') as f:
                 return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Error loading {file_path}: {e}")
+        
+        stat = file_path.stat()
+        cache_path = self.cache_dir / (filename + ".pickle")
+        snapshot = self._read_snapshot(cache_path)
+        if snapshot is not None and (snapshot["mtime_ns"], snapshot["size"]) == (stat.st_mtime_ns, stat.st_size):
+            return snapshot["data"]
+        
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if snapshot is not None and snapshot["sha256"] == digest:
+            data = snapshot["data"]
+        else:
+            data = json.loads(raw)
+        self._write_snapshot(cache_path, {
+            "format": CACHE_FORMAT,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "data": data
+        })
+        return data
+    
+    def _load_json_file(self, filename: str) -> Dict[str, Any]:
+        """Load a JSON file from the data directory; an unreadable file counts as empty"""
+        try:
+            return self._read_data_file(filename)
+        except (json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
+            print(f"Error loading {self.data_dir / filename}: {e}")
             return {}
     
+    def _read_snapshot(self, cache_path: Path) -> Optional[Dict[str, Any]]:
+        """Load a cached snapshot, or None if missing, unreadable or from another format"""
+        # The collector would scan the many new dicts repeatedly while they are built
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(cache_path, 'rb') as f:
+                checksum = f.read(CHECKSUM_SIZE)
+                payload = f.read()
+            if hashlib.sha256(payload).digest() != checksum:  # Truncated or damaged on disk
+                return None
+            snapshot = pickle.loads(payload)
+        except Exception:  # A corrupt file can fail in many ways; the cache is disposable
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if not isinstance(snapshot, dict) or snapshot.get("format") != CACHE_FORMAT:
+            return None
+        for key, expected in SNAPSHOT_FIELDS.items():
+            value = snapshot.get(key)
+            if not isinstance(value, expected) or isinstance(value, bool):
+                return None
+        return snapshot
+    
+    def _write_snapshot(self, cache_path: Path, snapshot: Dict[str, Any]):
+        """Write a snapshot atomically; a read-only data directory just means no cache"""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            payload = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(tmp_path, 'wb') as f:
+                f.write(hashlib.sha256(payload).digest())
+                f.write(payload)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    
+    def _compile(self, name: str, data: Dict[str, Any]) -> LoadedData:
+        """Validate raw entries into (data, records)"""
+        filename, record_class = DATA_FILES[name]
+        return data, compile_records(record_class, data, filename)
+    
+    def loaded(self, name: str) -> LoadedData:
+        """(raw entries, records) of a data file from the same load, loaded and validated on first use"""
+        loaded = self._loaded.get(name)
+        if loaded is None:
+            loaded = self._compile(name, self._load_json_file(DATA_FILES[name][0]))
+            self._loaded[name] = loaded
+        return loaded
+    
+    def _get(self, name: str) -> Dict[str, Any]:
+        """Raw entries of a data file"""
+        return self.loaded(name)[0]
+    
+    def _get_records(self, name: str) -> Dict[str, Any]:
+        """Compiled records of a data file"""
+        return self.loaded(name)[1]
+    
+    def view(self, name: str) -> 'DataView':
+        """Live read-only view of a data set ("races", "classes", "monsters" or "spells")"""
+        if name not in DATA_FILES:
+            raise ValueError(f"Unknown data set: {name}")
+        return DataView(self, name)
+    
     @property
     def races(self) -> Dict[str, Any]:
         """Get race definitions"""
-        if self._races is None:
-            self._races = self._load_json_file("races.json")
-        return self._races
+        return self._get("races")
     
     @property
     def classes(self) -> Dict[str, Any]:
         """Get character class definitions"""
-        if self._classes is None:
-            self._classes = self._load_json_file("classes.json")
-        return self._classes
+        return self._get("classes")
     
     @property
     def monsters(self) -> Dict[str, Any]:
         """Get monster definitions"""
-        if self._monsters is None:
-            self._monsters = self._load_json_file("monsters.json")
-        return self._monsters
+        return self._get("monsters")
     
     @property
     def spells(self) -> Dict[str, Any]:
         """Get spell definitions"""
-        if self._spells is None:
-            self._spells = self._load_json_file("spells.json")
-        return self._spells
+        return self._get("spells")
+    
+    @property
+    def race_defs(self) -> Dict[str, RaceDef]:
+        """Validated race records"""
+        return self._get_records("races")
+    
+    @property
+    def class_defs(self) -> Dict[str, ClassDef]:
+        """Validated character class records"""
+        return self._get_records("classes")
+    
+    @property
+    def monster_defs(self) -> Dict[str, MonsterDef]:
+        """Validated monster records"""
+        return self._get_records("monsters")
+    
+    @property
+    def spell_defs(self) -> Dict[str, SpellDef]:
+        """Validated spell records"""
+        return self._get_records("spells")
+    
+    @property
+    def search_index(self) -> SearchIndex:
+        """Full-text index over all game data, updated after a reload"""
+        if self._search_index_stale:
+            self._search_index.update("race", self.races)
+            self._search_index.update("class", self.classes)
+            self._search_index.update("monster", self.monsters)
+            self._search_index.update("spell", self.spells)
+            self._search_index_stale = False
+        return self._search_index
     
     def get_class(self, class_name: str) -> Optional[Dict[str, Any]]:
         """Get a specific character class definition"""
@@ -61,12 +207,97 @@ class DataLoader:
     
 
     
-    def reload(self):
-        """Reload all data from files"""
-        self._races = None
-        self._classes = None
-        self._monsters = None
-        self._spells = None
+    def derived(self, build: Callable[[], T], names: Optional[Iterable[str]] = None) -> 'DerivedCache[T]':
+        """Cache of build(), rebuilt on first use after a reload of any of the named data sets"""
+        cache = DerivedCache(build)
+        self.add_reload_listener(cache.invalidate, names)
+        return cache
+    
+    def add_reload_listener(self, listener: Callable[[], None], names: Optional[Iterable[str]] = None):
+        """Call listener after a reload of any of the named data sets (default: any reload)"""
+        self._reload_listeners.append((listener, frozenset(names) if names is not None else None))
+    
+    def reload(self, name: Optional[str] = None) -> List[str]:
+        """
+        Reload one data set (or all of them) from its file and return the names reloaded.
+        
+        New data is parsed and validated before anything is replaced, so a
+        broken file raises (json.JSONDecodeError, DataValidationError, OSError)
+        and leaves the current data in place. Once the new data is live,
+        listeners are notified; a failing listener is reported and does not
+        stop the others.
+        """
+        names = [name] if name is not None else list(DATA_FILES)
+        self._swap(names)
+        self._notify(names)
+        return names
+    
+    def _swap(self, names: List[str]):
+        """Parse and validate data sets, then replace them all at once"""
+        with self._reload_lock:
+            loaded = {n: self._compile(n, self._read_data_file(DATA_FILES[n][0])) for n in names}
+            self._loaded.update(loaded)
+            self._search_index_stale = True
+    
+    def _notify(self, names: List[str]):
+        """Call the listeners of reloaded data sets"""
+        for listener, listened in self._reload_listeners:
+            if listened is None or not listened.isdisjoint(names):
+                try:
+                    listener()
+                except Exception as e:
+                    print(f"Error in reload listener {getattr(listener, '__qualname__', listener)}: {e}")
+
+
+class DerivedCache(Generic[T]):
+    """A value built from loaded data, tagged with the generation it was built at"""
+    
+    def __init__(self, build: Callable[[], T]):
+        self._build = build
+        self._generation = 0  # Bumped by every invalidation
+        self._generation_lock = threading.Lock()
+        self._cached: Optional[Tuple[int, T]] = None
+    
+    def invalidate(self):
+        """Rebuild on next use"""
+        with self._generation_lock:
+            self._generation += 1
+    
+    def get(self) -> T:
+        """The cached value, rebuilt if it predates the last invalidation"""
+        generation = self._generation
+        cached = self._cached
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        value = self._build()
+        # Tagged with the generation read before building, so an invalidation meanwhile leaves it stale
+        self._cached = (generation, value)
+        return value
+
+
+class DataView(Mapping):
+    """Read-only mapping over a data set that always shows the latest reload"""
+    
+    __slots__ = ('_loader', '_name')
+    
+    def __init__(self, loader: DataLoader, name: str):
+        self._loader = loader
+        self._name = name
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._loader._get(self._name)[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loader._get(self._name))
+    
+    def __len__(self) -> int:
+        return len(self._loader._get(self._name))
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self._loader._get(self._name)
+    
+    def __repr__(self) -> str:
+        return f"DataView({self._name!r})"
 
 # Global data loader instance
 data_loader = DataLoader() 
\ No newline at end of file
@@ -0,0 +1,287 @@
+"""
+Data schemas for D&D 3.5e RPG
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Type, TypeVar
+from dice import DiceExpression, compile_dice
+
+ABILITIES = ('strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma')
+BASE_ATTACK_PROGRESSIONS = ('good', 'medium', 'poor')
+EQUIPMENT_SLOTS = ('weapons', 'armor', 'items')
+DEFAULT_ENCOUNTER_WEIGHT = 1.0
+# Valid monster "behavior" names; monster_ai.register_behavior adds new ones
+MONSTER_BEHAVIORS = {'aggressive', 'focus_weakest', 'flee_at_low_hp', 'special_ability'}
+
+_MISSING = object()
+
+
+class DataValidationError(ValueError):
+    """A data file entry does not match its schema"""
+
+    def __init__(self, source: str, entry: str, message: str):
+        super().__init__(f"{source}: {entry}: {message}")
+        self.source = source
+        self.entry = entry
+
+
+class _Reader:
+    """Typed access to the fields of one raw entry"""
+
+    def __init__(self, source: str, name: str, data: Any):
+        self.source = source
+        self.name = name
+        if not isinstance(data, dict):
+            self.fail(f"expected an object, got {type(data).__name__}")
+        self.data = data
+
+    def fail(self, message: str):
+        raise DataValidationError(self.source, self.name, message)
+
+    def get(self, key: str, check: Callable[[Any], bool], expected: str, default: Any = _MISSING) -> Any:
+        value = self.data.get(key, _MISSING)
+        if value is _MISSING or value is None:
+            if default is _MISSING:
+                self.fail(f"missing required field '{key}'")
+            return default
+        if not check(value):
+            self.fail(f"field '{key}' should be {expected}, got {value!r}")
+        return value
+
+    def integer(self, key: str, default: Any = _MISSING, minimum: Optional[int] = None) -> int:
+        value = self.get(key, lambda v: isinstance(v, int) and not isinstance(v, bool), "an integer", default)
+        if minimum is not None and value is not None and value < minimum:
+            self.fail(f"field '{key}' should be at least {minimum}, got {value}")
+        return value
+
+    def number(self, key: str, default: Any = _MISSING) -> float:
+        return self.get(key, lambda v: isinstance(v, (int, float)) and not isinstance(v, bool), "a number", default)
+
+    def text(self, key: str, default: Any = _MISSING) -> str:
+        return self.get(key, lambda v: isinstance(v, str), "a string", default)
+
+    def flag(self, key: str, default: Any = _MISSING) -> bool:
+        return self.get(key, lambda v: isinstance(v, bool), "true or false", default)
+
+    def texts(self, key: str) -> Tuple[str, ...]:
+        return tuple(self.get(key, lambda v: isinstance(v, list) and all(isinstance(i, str) for i in v),
+                              "a list of strings", []))
+
+    def dice(self, key: str, default: Any = _MISSING) -> Optional[DiceExpression]:
+        text = self.text(key, default)
+        if text is None:
+            return None
+        try:
+            return compile_dice(text)
+        except ValueError as e:
+            self.fail(f"field '{key}' is not a dice expression: {e}")
+
+    def abilities(self, key: str, default: Any = _MISSING) -> Mapping[str, int]:
+        scores = self.get(key, lambda v: isinstance(v, dict), "an object", default)
+        for ability, score in scores.items():
+            if ability not in ABILITIES + ('all',):
+                self.fail(f"unknown ability '{ability}' in '{key}'")
+            if not isinstance(score, int) or isinstance(score, bool):
+                self.fail(f"'{key}.{ability}' should be an integer, got {score!r}")
+        return MappingProxyType(dict(scores))
+
+
+@dataclass(frozen=True)
+class RaceDef:
+    """A playable race"""
+    name: str
+    description: str
+    ability_bonuses: Mapping[str, int]
+    traits: Tuple[str, ...]
+    favored_class: str
+
+    @classmethod
+    def parse(cls, name: str, data: Any, source: str = "races.json") -> 'RaceDef':
+        entry = _Reader(source, name, data)
+        return cls(
+            name=name,
+            description=entry.text('description', ""),
+            ability_bonuses=entry.abilities('ability_bonuses', {}),
+            traits=entry.texts('traits'),
+            favored_class=entry.text('favored_class', "Any"),
+        )
+
+    def apply_bonuses(self, abilities: Dict[str, int]) -> Dict[str, int]:
+        """Copy of the ability scores with the racial bonuses added"""
+        abilities = dict(abilities)
+        for ability, bonus in self.ability_bonuses.items():
+            for name in (abilities if ability == 'all' else (ability,)):
+                abilities[name] += bonus
+        return abilities
+
+
+@dataclass(frozen=True)
+class ClassDef:
+    """A character class"""
+    name: str
+    description: str
+    hit_die: int  # Sides of the hit die, 10 for "d10"
+    base_attack: str  # "good", "medium" or "poor" progression
+    class_features: Tuple[str, ...]
+    starting_equipment: Mapping[str, Tuple[str, ...]]  # "weapons", "armor" and "items"
+
+    @classmethod
+    def parse(cls, name: str, data: Any, source: str = "classes.json") -> 'ClassDef':
+        entry = _Reader(source, name, data)
+        hit_die = entry.text('hit_die')
+        if not hit_die.startswith('d') or not hit_die[1:].isdigit():
+            entry.fail(f"field 'hit_die' should look like 'd8', got {hit_die!r}")
+        base_attack = entry.text('base_attack').lower()
+        if base_attack == 'average':
+            base_attack = 'medium'
+        if base_attack not in BASE_ATTACK_PROGRESSIONS:
+            entry.fail(f"field 'base_attack' should be one of {', '.join(BASE_ATTACK_PROGRESSIONS)}")
+
+        equipment = entry.get('starting_equipment', lambda v: isinstance(v, dict), "an object", {})
+        for slot, items in equipment.items():
+            if slot not in EQUIPMENT_SLOTS:
+                entry.fail(f"unknown equipment slot '{slot}'")
+            if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+                entry.fail(f"'starting_equipment.{slot}' should be a list of strings")
+
+        return cls(
+            name=name,
+            description=entry.text('description', ""),
+            hit_die=int(hit_die[1:]),
+            base_attack=base_attack,
+            class_features=entry.texts('class_features'),
+            starting_equipment=MappingProxyType({slot: tuple(items) for slot, items in equipment.items()}),
+        )
+
+    def base_attack_bonus(self, level: int) -> int:
+        """Base attack bonus at a class level"""
+        if self.base_attack == 'good':
+            return level
+        if self.base_attack == 'medium':
+            return level * 3 // 4
+        return level // 2
+
+
+@dataclass(frozen=True)
+class SpecialAttackDef:
+    """A monster's limited-use special attack"""
+    name: str
+    attack_bonus: int  # Added to the monster's own attack bonus
+    damage: DiceExpression
+    damage_bonus: int
+    uses: int
+
+
+@dataclass(frozen=True)
+class MonsterDef:
+    """A monster type"""
+    name: str
+    level: int
+    max_hp: int
+    armor_class: int
+    initiative_bonus: int
+    attack_bonus: int
+    damage: DiceExpression
+    damage_bonus: int
+    xp_value: int
+    encounter_weight: float
+    behavior: Optional[str]
+    special_attack: Optional[SpecialAttackDef]
+    abilities: Mapping[str, int]
+    special_abilities: Tuple[str, ...]
+    description: str
+
+    @classmethod
+    def parse(cls, name: str, data: Any, source: str = "monsters.json") -> 'MonsterDef':
+        entry = _Reader(source, name, data)
+        behavior = entry.text('behavior', None)
+        if behavior is not None and behavior not in MONSTER_BEHAVIORS:
+            entry.fail(f"unknown behavior '{behavior}' (known: {', '.join(sorted(MONSTER_BEHAVIORS))})")
+
+        special_attack = None
+        if data.get('special_attack') is not None:
+            special = _Reader(source, f"{name}.special_attack", data['special_attack'])
+            special_attack = SpecialAttackDef(
+                name=special.text('name'),
+                attack_bonus=special.integer('attack_bonus', 0),
+                damage=special.dice('damage'),
+                damage_bonus=special.integer('damage_bonus', 0),
+                uses=special.integer('uses', 1, minimum=1),
+            )
+
+        encounter_weight = entry.number('encounter_weight', DEFAULT_ENCOUNTER_WEIGHT)
+        if encounter_weight < 0:
+            entry.fail("field 'encounter_weight' should not be negative")
+
+        return cls(
+            name=name,
+            level=entry.integer('level', 1, minimum=1),
+            max_hp=entry.integer('max_hp', minimum=1),
+            armor_class=entry.integer('armor_class'),
+            initiative_bonus=entry.integer('initiative_bonus', 0),
+            attack_bonus=entry.integer('attack_bonus'),
+            damage=entry.dice('damage'),
+            damage_bonus=entry.integer('damage_bonus', 0),
+            xp_value=entry.integer('xp_value', 0, minimum=0),
+            encounter_weight=encounter_weight,
+            behavior=behavior,
+            special_attack=special_attack,
+            abilities=entry.abilities('abilities', {}),
+            special_abilities=entry.texts('special_abilities'),
+            description=entry.text('description', ""),
+        )
+
+
+@dataclass(frozen=True)
+class SpellDef:
+    """A spell"""
+    name: str
+    level: int
+    school: str
+    spell_class: str  # The "class" field: which class casts it
+    effect: str
+    area_effect: bool
+    saving_throw: str
+    heal_amount: Optional[DiceExpression]
+    damage_amount: Optional[DiceExpression]
+    damage_type: Optional[str]
+    status_type: Optional[str]
+    buff_type: Optional[str]
+    bonus: Optional[int]
+    description: str
+
+    @classmethod
+    def parse(cls, name: str, data: Any, source: str = "spells.json") -> 'SpellDef':
+        entry = _Reader(source, name, data)
+        effect = entry.text('effect', "utility")
+        return cls(
+            name=name,
+            level=entry.integer('level', minimum=0),
+            school=entry.text('school'),
+            spell_class=entry.text('class'),
+            effect=effect,
+            area_effect=entry.flag('area_effect', False),
+            saving_throw=entry.text('saving_throw', "None"),
+            heal_amount=entry.dice('heal_amount', _MISSING if effect == "heal" else None),
+            damage_amount=entry.dice('damage_amount', _MISSING if effect == "damage" else None),
+            damage_type=entry.text('damage_type', None),
+            status_type=entry.text('status_type', None),
+            buff_type=entry.text('buff_type', None),
+            bonus=entry.integer('bonus', None),
+            description=entry.text('description', ""),
+        )
+
+
+Record = TypeVar('Record', RaceDef, ClassDef, MonsterDef, SpellDef)
+
+
+def compile_records(record_class: Type[Record], data: Dict[str, Any], source: str) -> Dict[str, Record]:
+    """Validate every entry of a data file and compile it into records"""
+    if not isinstance(data, dict):
+        raise DataValidationError(source, "<file>", "expected an object of named entries")
+    records = {}
+    for name, entry in data.items():
+        if isinstance(entry, dict) and entry.get('name', name) != name:
+            raise DataValidationError(source, name, f"field 'name' is {entry['name']!r}, but the entry is named {name!r}")
+        records[name] = record_class.parse(name, entry, source)
+    return records
@@ -0,0 +1,72 @@
+"""
+Data file watcher for D&D 3.5e RPG
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+from data_loader import DATA_FILES, DataLoader, data_loader
+
+DEFAULT_INTERVAL = 1.0  # Seconds between polls
+
+# (mtime_ns, size) of a file, None if it does not exist
+Signature = Optional[Tuple[int, int]]
+
+
+class DataWatcher:
+    """Reloads data files when they change on disk"""
+
+    def __init__(self, loader: DataLoader = data_loader, interval: float = DEFAULT_INTERVAL):
+        self.loader = loader
+        self.interval = interval
+        self._signatures: Dict[str, Signature] = {name: self._signature(name) for name in DATA_FILES}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _signature(self, name: str) -> Signature:
+        try:
+            stat = (self.loader.data_dir / DATA_FILES[name][0]).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> List[str]:
+        """Poll once and reload every changed file; returns the names reloaded"""
+        reloaded = []
+        for name, old in self._signatures.items():
+            signature = self._signature(name)
+            if signature == old:
+                continue
+            self._signatures[name] = signature
+            if signature is None:
+                continue  # Deleted or being replaced; keep the current data
+            try:
+                self.loader.reload(name)
+            except (ValueError, OSError) as e:  # JSON and schema errors, raised before the swap
+                print(f"Error reloading {DATA_FILES[name][0]}, keeping the previous data: {e}")
+                continue
+            except Exception as e:
+                print(f"Unexpected error reloading {DATA_FILES[name][0]}: {e}")
+                continue
+            reloaded.append(name)
+        return reloaded
+
+    def start(self):
+        """Start polling in a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling and wait for the thread to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:  # One bad poll must not end hot reload for the session
+                print(f"Error checking data files: {e}")
@@ -0,0 +1,177 @@
+"""
+Dice expression compiler for D&D 3.5e RPG
+"""
+import random
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Batch rolling is unavailable without NumPy
+    np = None
+
+# NdS with an optional kh/k, kl, dh or dl/d K suffix (keep or drop K dice), or a constant
+_TERM_PATTERN = re.compile(r'([+-])?(?:(\d*)d(\d+)(?:(kh|kl|dh|dl|k|d)(\d+))?|(\d+))')
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    """A group of identical dice, e.g. the '4d6dl1' in '4d6dl1+2'"""
+    count: int
+    sides: int
+    keep: int
+    keep_highest: bool = True
+    sign: int = 1
+
+    @property
+    def is_plain(self) -> bool:
+        """True when every die rolled counts towards the total"""
+        return self.keep == self.count
+
+
+class DiceExpression:
+    """A compiled dice expression, ready to be rolled any number of times"""
+
+    __slots__ = ('text', 'terms', 'modifier', '_plain')
+
+    def __init__(self, text: str, terms: Tuple[DiceTerm, ...], modifier: int = 0):
+        self.text = text
+        self.terms = terms
+        self.modifier = modifier
+        # Fast path data for the common case of plain NdS terms: (count, sides, sign)
+        self._plain = tuple((t.count, t.sides, t.sign) for t in terms) \
+            if all(t.is_plain for t in terms) else None
+
+    def roll(self, rng: Optional[random.Random] = None) -> int:
+        """Roll the expression and return the total"""
+        randint = (rng or random).randint
+        total = self.modifier
+        if self._plain is not None:
+            for count, sides, sign in self._plain:
+                subtotal = 0
+                for _ in range(count):
+                    subtotal += randint(1, sides)
+                total += sign * subtotal
+            return total
+        for term in self.terms:
+            rolls = [randint(1, term.sides) for _ in range(term.count)]
+            if not term.is_plain:
+                rolls.sort(reverse=term.keep_highest)
+                rolls = rolls[:term.keep]
+            total += term.sign * sum(rolls)
+        return total
+
+    def roll_batch(self, n: int, generator=None) -> "np.ndarray":
+        """
+        Roll the expression n times and return an int64 array of totals
+
+        generator is a numpy.random.Generator; a fresh one is used if omitted.
+        """
+        generator = generator if generator is not None else default_generator()
+        totals = np.full(n, self.modifier, dtype=np.int64)
+        for term in self.terms:
+            rolls = generator.integers(1, term.sides + 1, size=(n, term.count), dtype=np.int64)
+            if not term.is_plain:
+                rolls.sort(axis=1)
+                rolls = rolls[:, term.count - term.keep:] if term.keep_highest else rolls[:, :term.keep]
+            subtotal = rolls.sum(axis=1)
+            if term.sign > 0:
+                totals += subtotal
+            else:
+                totals -= subtotal
+        return totals
+
+    @property
+    def minimum(self) -> int:
+        """Lowest possible total"""
+        return self.modifier + sum(t.keep if t.sign > 0 else -t.keep * t.sides for t in self.terms)
+
+    @property
+    def maximum(self) -> int:
+        """Highest possible total"""
+        return self.modifier + sum(t.keep * t.sides if t.sign > 0 else -t.keep for t in self.terms)
+
+    def __add__(self, bonus: int) -> 'DiceExpression':
+        """Return a new expression with a flat bonus added"""
+        if bonus == 0:
+            return self
+        text = f"{self.text}{bonus:+d}"
+        return DiceExpression(text, self.terms, self.modifier + bonus)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DiceExpression):
+            return NotImplemented
+        return self.terms == other.terms and self.modifier == other.modifier
+
+    def __hash__(self) -> int:
+        return hash((self.terms, self.modifier))
+
+    def __reduce__(self):
+        return (DiceExpression, (self.text, self.terms, self.modifier))
+
+    def __repr__(self) -> str:
+        return f"DiceExpression({self.text!r})"
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def default_generator() -> "np.random.Generator":
+    """Return a fresh NumPy generator, raising ImportError if NumPy is missing"""
+    if np is None:
+        raise ImportError("Batch dice rolling requires NumPy (pip install numpy)")
+    return np.random.default_rng()
+
+
+def _parse_term(sign: str, count: str, sides: str, keep_op: str, keep_n: str) -> DiceTerm:
+    """Build a DiceTerm from the pieces matched by _TERM_PATTERN"""
+    count = int(count) if count else 1
+    sides = int(sides)
+    if count < 1 or sides < 1:
+        raise ValueError("Dice count and sides must be at least 1")
+
+    keep, keep_highest = count, True
+    if keep_op:
+        n = int(keep_n)
+        if keep_op in ('kh', 'k'):
+            keep, keep_highest = n, True
+        elif keep_op == 'kl':
+            keep, keep_highest = n, False
+        elif keep_op in ('dl', 'd'):
+            keep, keep_highest = count - n, True
+        else:  # dh
+            keep, keep_highest = count - n, False
+        if not 0 < keep <= count:
+            raise ValueError(f"Cannot keep {keep} of {count} dice")
+
+    return DiceTerm(count, sides, keep, keep_highest, -1 if sign == '-' else 1)
+
+
+@lru_cache(maxsize=1024)
+def compile_dice(expression: str) -> DiceExpression:
+    """
+    Parse a dice expression into a cached DiceExpression
+
+    Raises ValueError if the expression is malformed.
+    """
+    text = expression.replace(' ', '').lower()
+    if not text:
+        raise ValueError("Empty dice expression")
+
+    terms = []
+    modifier = 0
+    pos = 0
+    while pos < len(text):
+        match = _TERM_PATTERN.match(text, pos)
+        if not match or match.end() == pos or (pos > 0 and not match.group(1)):
+            raise ValueError(f"Invalid dice expression: {expression!r}")
+        sign, count, sides, keep_op, keep_n, constant = match.groups()
+        if constant is not None:
+            modifier += -int(constant) if sign == '-' else int(constant)
+        else:
+            terms.append(_parse_term(sign, count, sides, keep_op, keep_n))
+        pos = match.end()
+
+    return DiceExpression(text, tuple(terms), modifier)
@@ -3,7 +3,8 @@ Dungeon generation and navigation for D&D 3.5e RPG
 """
 import random
 from typing import Dict, Any, List, Optional
-from utils import print_narrative, dramatic_pause, console
+from config import config
+from rng import rng_service, DUNGEON, ENCOUNTERS, LOOT
 
 # Room types and their descriptions
 ROOM_TYPES = {
@@ -82,9 +83,10 @@ class DungeonRoom:
 class Dungeon:
     """Represents the entire dungeon"""
     
-    def __init__(self, width: int = 5, height: int = 5):
+    def __init__(self, width: int = 5, height: int = 5, rng: Optional[random.Random] = None):
         self.width = width
         self.height = height
+        self.rng = rng or rng_service.stream(DUNGEON)
         self.rooms = {}  # (x, y) -> DungeonRoom
         self.current_position = (0, 0)
         self.entrance = (0, 0)
@@ -116,10 +118,10 @@ class Dungeon:
         
         # Try to add rooms in each direction
         directions = list(DIRECTIONS.keys())
-        random.shuffle(directions)
+        self.rng.shuffle(directions)
         
         for direction in directions:
-            if random.random() < 0.7:  # 70% chance to add a room
+            if self.rng.random() < 0.7:  # 70% chance to add a room
                 dx, dy = DIRECTIONS[direction]
                 new_x, new_y = x + dx, y + dy
                 
@@ -129,9 +131,9 @@ class Dungeon:
                     if depth < 3:
                         room_type = "corridor"
                     elif depth < 8:
-                        room_type = random.choice(["corridor", "chamber"])
+                        room_type = self.rng.choice(["corridor", "chamber"])
                     else:
-                        room_type = random.choice(["chamber", "treasure_room"])
+                        room_type = self.rng.choice(["chamber", "treasure_room"])
                     
                     new_room = DungeonRoom(room_type, new_x, new_y)
                     self.rooms[(new_x, new_y)] = new_room
@@ -171,7 +173,7 @@ class Dungeon:
         
         # Convert some chambers to treasure rooms
         num_treasure_rooms = min(2, len(chamber_rooms) // 3)
-        treasure_locations = random.sample(chamber_rooms, num_treasure_rooms)
+        treasure_locations = self.rng.sample(chamber_rooms, num_treasure_rooms)
         
         for x, y in treasure_locations:
             treasure_room = DungeonRoom("treasure_room", x, y)
@@ -193,6 +195,8 @@ class Dungeon:
     
     def move(self, direction: str) -> bool:
         """Move in the specified direction"""
+        # Terminal helpers imported here so generation works headless (calibrate.py)
+        from utils import console, dramatic_pause
         current_room = self.get_current_room()
         
         if direction not in current_room.exits:
@@ -248,29 +252,38 @@ class Dungeon:
         map_str += "\nLegend: P=Player, E=Entrance, B=Boss, T=Treasure, C=Chamber, R=Room, .=Empty"
         return map_str
 
-def create_dungeon(width: int = 5, height: int = 5) -> Dungeon:
+def create_dungeon(width: int = 5, height: int = 5, rng: Optional[random.Random] = None) -> Dungeon:
     """Create a new dungeon"""
+    from utils import console, dramatic_pause
+    
     console.print("[yellow]Generating dungeon...[/yellow]")
     dramatic_pause(1.0)
     
-    dungeon = Dungeon(width, height)
+    dungeon = Dungeon(width, height, rng)
     
     console.print("[green]Dungeon generated successfully![/green]")
     console.print(f"Created {len(dungeon.rooms)} rooms.")
     
     return dungeon
 
+def get_encounter_chance(room_type: str) -> float:
+    """Encounter chance of a room type, with overrides from the dungeon config"""
+    overrides = config.get("dungeon", "room_encounter_chance", {})
+    return overrides.get(room_type, ROOM_TYPES[room_type]["encounter_chance"])
+
 def explore_room(room: DungeonRoom, character: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
     """Explore a room and potentially trigger an encounter"""
+    from utils import console
+    
     if room.encounter:
         return room.encounter
     
     # Check if encounter should occur
-    encounter_chance = ROOM_TYPES[room.room_type]["encounter_chance"]
+    encounter_chance = get_encounter_chance(room.room_type)
     
-    if random.random() < encounter_chance:
+    if rng_service.stream(ENCOUNTERS).random() < encounter_chance:
         # Create random encounter
-        from combat import create_random_encounter
+        from encounters import create_random_encounter
         enemies = create_random_encounter(character['level'])
         room.encounter = enemies
         
@@ -293,25 +306,26 @@ def explore_room(room: DungeonRoom, character: Dict[str, Any]) -> Optional[List[
     
     return None
 
-def generate_treasure() -> Dict[str, Any]:
+def generate_treasure(rng: Optional[random.Random] = None) -> Dict[str, Any]:
     """Generate random treasure"""
+    rng = rng or rng_service.stream(LOOT)
     treasure_types = [
         {
             "description": "A small chest contains gold coins and a few gems.",
-            "items": {"Gold coins": random.randint(10, 50), "Gem": random.randint(1, 3)}
+            "items": {"Gold coins": rng.randint(10, 50), "Gem": rng.randint(1, 3)}
         },
         {
             "description": "An ornate vase holds ancient coins and jewelry.",
-            "items": {"Ancient coins": random.randint(5, 20), "Jewelry": 1}
+            "items": {"Ancient coins": rng.randint(5, 20), "Jewelry": 1}
         },
         {
             "description": "A dusty shelf holds magical scrolls and potions.",
-            "items": {"Scroll": random.randint(1, 3), "Potion of Healing": random.randint(1, 2)}
+            "items": {"Scroll": rng.randint(1, 3), "Potion of Healing": rng.randint(1, 2)}
         },
         {
             "description": "A wooden crate contains adventuring supplies.",
-            "items": {"Potion of Healing": random.randint(1, 3), "Rations": random.randint(1, 5)}
+            "items": {"Potion of Healing": rng.randint(1, 3), "Rations": rng.randint(1, 5)}
         }
     ]
     
-    return random.choice(treasure_types) 
\ No newline at end of file
+    return rng.choice(treasure_types) 
\ No newline at end of file
@@ -3,9 +3,19 @@ AI Dungeon Master for D&D 3.5e RPG
 """
 import os
 import json
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional
 from openai import OpenAI
 from utils import console, print_narrative, dramatic_pause, print_info
+from combat_events import CombatEvent, EventType, format_event
+from config import config
+
+# Events worth narrating; bookkeeping events are left out of round prompts
+NARRATED_EVENTS = {
+    EventType.ATTACK, EventType.SPECIAL_ATTACK, EventType.HIT, EventType.MISS,
+    EventType.DOWNED, EventType.SPELL, EventType.SPELL_FAILED, EventType.ITEM,
+    EventType.FLEE, EventType.FLEE_FAILED
+}
 
 class DungeonMaster:
     """AI Dungeon Master that narrates and manages the adventure"""
@@ -30,40 +40,72 @@ class DungeonMaster:
             "tone": "epic and mysterious"
         }
     
-    def generate_narration(self, prompt: str, context: Dict[str, Any] = None) -> str:
-        """Generate AI narration using OpenAI"""
+    def generate_narration(self, prompt: str, context: Dict[str, Any] = None,
+                           timeout: Optional[float] = None, max_tokens: int = 150,
+                           fallback: bool = True) -> str:
+        """
+        Generate AI narration using OpenAI.
+        
+        With a timeout, a request that fails or takes longer gives the fallback
+        narration, or "" when fallback is False.
+        """
         if not self.client:
-            return self._fallback_narration(prompt)
+            return self._fallback_narration(prompt) if fallback else ""
         
-        try:
-            # Build the full prompt with context
-            full_prompt = self._build_prompt(prompt, context)
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a skilled Dungeon Master for a D&D 3.5e game. 
-                        Create vivid, atmospheric descriptions that immerse players in the adventure. 
-                        Keep responses concise (2-3 sentences) and focus on sensory details and mood. 
-                        Use dramatic language appropriate for fantasy role-playing."""
-                    },
-                    {
-                        "role": "user",
-                        "content": full_prompt
-                    }
-                ],
-                max_tokens=150,
-                temperature=0.8
-            )
-            
-            return response.choices[0].message.content.strip()
+        if timeout is None:
+            return self._request_narration(prompt, context, max_tokens)
         
+        # A daemon thread that never prints: a slow request cannot hold up exit
+        # or write into a later turn, it finishes in the background and is dropped
+        result: List[str] = []
+        
+        def request():
+            try:
+                result.append(self._complete(prompt, context, max_tokens))
+            except Exception:
+                pass
+        
+        thread = threading.Thread(target=request, name="narration", daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if result:
+            return result[0]
+        return self._fallback_narration(prompt) if fallback else ""
+    
+    def _request_narration(self, prompt: str, context: Dict[str, Any] = None, max_tokens: int = 150) -> str:
+        """Send one chat completion request, falling back if it fails"""
+        try:
+            return self._complete(prompt, context, max_tokens)
         except Exception as e:
             console.print(f"[yellow]AI narration failed: {e}. Using fallback.[/yellow]")
             return self._fallback_narration(prompt)
     
+    def _complete(self, prompt: str, context: Dict[str, Any] = None, max_tokens: int = 150) -> str:
+        """Send one chat completion request"""
+        # Build the full prompt with context
+        full_prompt = self._build_prompt(prompt, context)
+        
+        response = self.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {
+                    "role": "system",
+                    "content": """You are a skilled Dungeon Master for a D&D 3.5e game. 
+                    Create vivid, atmospheric descriptions that immerse players in the adventure. 
+                    Keep responses concise (2-3 sentences) and focus on sensory details and mood. 
+                    Use dramatic language appropriate for fantasy role-playing."""
+                },
+                {
+                    "role": "user",
+                    "content": full_prompt
+                }
+            ],
+            max_tokens=max_tokens,
+            temperature=0.8
+        )
+        
+        return response.choices[0].message.content.strip()
+    
     def _build_prompt(self, prompt: str, context: Dict[str, Any] = None) -> str:
         """Build a complete prompt with context"""
         context_str = ""
@@ -163,6 +205,27 @@ Provide a brief, atmospheric description:"""
         
         return narration
     
+    def describe_combat_round(self, round_num: int, events: List[CombatEvent]) -> str:
+        """Describe a whole combat round with a single request (nothing without a timely AI reply)"""
+        actions = [format_event(event) for event in events if event.type in NARRATED_EVENTS]
+        if not actions:
+            return ""
+        context = {
+            "round": round_num,
+            "events": actions
+        }
+        
+        prompt = f"Narrate round {round_num} of the combat as one short paragraph, covering every event in order."
+        
+        # The canned fallback would repeat the same line every round, so skip it
+        timeout = config.get("ai", "narration_timeout", 2.0)
+        narration = self.generate_narration(prompt, context, timeout=timeout,
+                                            max_tokens=config.get("ai", "max_tokens", 150), fallback=False)
+        if narration:
+            print_narrative(narration, "yellow")
+        
+        return narration
+    
     def describe_victory(self, character: Dict[str, Any], enemies: List[Dict[str, Any]]) -> str:
         """Describe victory in combat"""
         context = {
@@ -256,4 +319,39 @@ Provide a brief, atmospheric description:"""
             "tone": tone
         }
         
-        print_info(f"Adventure theme set to: {theme} in {setting} with {tone} tone") 
\ No newline at end of file
+        print_info(f"Adventure theme set to: {theme} in {setting} with {tone} tone")
+
+class CombatNarrator:
+    """Combat log subscriber that has the Dungeon Master narrate the fight"""
+    
+    def __init__(self, dungeon_master: DungeonMaster, mode: Optional[str] = None):
+        self.dm = dungeon_master
+        self.mode = mode or config.get("ai", "narration_mode", "per_round")  # per_round, per_action or off
+        self.round = 0
+        self.events: List[CombatEvent] = []
+    
+    def __call__(self, event: CombatEvent):
+        if self.mode == "per_action":
+            if event.type in (EventType.HIT, EventType.MISS):
+                self.dm.describe_combat_action({'name': event.actor.name}, {'name': event.target.name},
+                                               event.type == EventType.HIT, event.value or 0)
+            return
+        if self.mode != "per_round":
+            return
+        
+        if event.type == EventType.ROUND_START:
+            self.flush()
+            self.round = event.round
+        elif event.type in NARRATED_EVENTS:
+            self.events.append(event)
+        
+        # The fight is over: narrate the last round before the result is shown
+        if event.type in (EventType.VICTORY, EventType.DEFEAT) or (
+                event.type == EventType.FLEE and not event.actor.is_monster):
+            self.flush()
+    
+    def flush(self):
+        """Narrate the events collected so far as one round"""
+        if self.events:
+            events, self.events = self.events, []
+            self.dm.describe_combat_round(self.round, events) 
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Random encounter tables for D&D 3.5e RPG
+"""
+import random
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence
+from combatant import new_combatant_id
+from data_loader import data_loader
+from data_schema import MonsterDef
+from monster_templates import MonsterInstance, monster_templates
+from rng import rng_service, ENCOUNTERS
+
+LEVEL_MARGIN = 1  # Monsters up to character level + 1 can appear
+
+# Live view of the monster data, follows reloads
+MONSTERS = data_loader.view("monsters")
+
+
+class AliasTable:
+    """Weighted sampling in O(1) per draw (Vose's alias method)"""
+
+    __slots__ = ('items', 'probability', 'alias')
+
+    def __init__(self, items: Sequence[Any], weights: Sequence[float]):
+        if not items or len(items) != len(weights):
+            raise ValueError("Alias table needs one weight per item and at least one item")
+        total = float(sum(weights))
+        if total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("Alias table weights must be non-negative with a positive sum")
+
+        n = len(items)
+        self.items = list(items)
+        self.probability = [0.0] * n
+        self.alias = list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1 up to rounding error
+        for i in large + small:
+            self.probability[i] = 1.0
+
+    def sample(self, rng: random.Random) -> Any:
+        """Draw one item"""
+        column = int(rng.random() * len(self.items))
+        if rng.random() < self.probability[column]:
+            return self.items[column]
+        return self.items[self.alias[column]]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class EncounterTable:
+    """Monsters that can appear for one character level"""
+
+    def __init__(self, level: int, monsters: Dict[str, MonsterDef]):
+        self.level = level
+        names = [name for name, monster in monsters.items() if monster.level <= level + LEVEL_MARGIN]
+        if not names:
+            names = list(monsters)
+        self.names = names
+        self.weights = [monsters[name].encounter_weight for name in names]
+        self.xp_values = {name: monsters[name].xp_value for name in names}
+        self.table = AliasTable(names, self.weights)
+
+        # Alias tables over the cheapest monsters, one per distinct xp_value
+        by_xp = sorted(zip((monsters[name].xp_value for name in names), names, self.weights))
+        self.xp_thresholds: List[int] = []
+        self.budget_tables: List[AliasTable] = []
+        for i, (xp, _, _) in enumerate(by_xp):
+            if i + 1 < len(by_xp) and by_xp[i + 1][0] == xp:
+                continue
+            affordable = by_xp[:i + 1]
+            if sum(w for _, _, w in affordable) <= 0:
+                continue
+            self.xp_thresholds.append(xp)
+            self.budget_tables.append(AliasTable([n for _, n, _ in affordable], [w for _, _, w in affordable]))
+
+    def sample(self, rng: random.Random) -> str:
+        """Draw one monster type"""
+        return self.table.sample(rng)
+
+    def sample_within(self, rng: random.Random, xp_budget: int) -> Optional[str]:
+        """Draw one monster type whose xp_value fits the budget, or None if none fits"""
+        index = bisect_right(self.xp_thresholds, xp_budget) - 1
+        if index < 0:
+            return None
+        return self.budget_tables[index].sample(rng)
+
+    def sample_cheapest(self, rng: random.Random) -> str:
+        """Draw one of the monster types with the lowest xp_value"""
+        if not self.budget_tables:
+            return self.sample(rng)
+        return self.budget_tables[0].sample(rng)
+
+    def sample_group(self, rng: random.Random, xp_budget: int, max_size: Optional[int] = None) -> List[str]:
+        """Draw monster types until the XP budget (or max_size) is used up"""
+        group: List[str] = []
+        remaining = xp_budget
+        while max_size is None or len(group) < max_size:
+            name = self.sample_within(rng, remaining)
+            if name is None:
+                break
+            group.append(name)
+            xp = self.xp_values[name]
+            if xp <= 0 and max_size is None:
+                break  # Free monsters would never exhaust the budget
+            remaining -= xp
+        return group
+
+
+class EncounterTables:
+    """Encounter tables for every character level, built from data_loader.monsters"""
+
+    def __init__(self):
+        self._tables = data_loader.derived(self.build, ["monsters"])
+
+    def invalidate(self):
+        """Drop the tables so they are rebuilt from the current monster data"""
+        self._tables.invalidate()
+
+    def build(self) -> List[EncounterTable]:
+        """Build one table per level up to the point where every monster is included"""
+        monsters = data_loader.monster_defs
+        if not monsters:
+            raise ValueError("No monsters loaded")
+        top_level = max(1, max(monster.level for monster in monsters.values()) - LEVEL_MARGIN)
+        return [EncounterTable(level, monsters) for level in range(1, top_level + 1)]
+
+    def for_level(self, character_level: int) -> EncounterTable:
+        """Encounter table for a character level"""
+        tables = self._tables.get()
+        return tables[min(max(character_level, 1), len(tables)) - 1]
+
+
+# Global encounter tables instance
+encounter_tables = EncounterTables()
+
+
+def create_monster(monster_type: str, rng: Optional[random.Random] = None) -> MonsterInstance:
+    """Create a monster of the specified type"""
+    if monster_type not in MONSTERS:
+        monster_type = (rng or rng_service.stream(ENCOUNTERS)).choice(list(MONSTERS.keys()))
+
+    # Shared read-only template plus a per-monster overlay for id and hit points
+    return monster_templates.get(monster_type).spawn(new_combatant_id())
+
+
+def create_random_encounter(character_level: int, rng: Optional[random.Random] = None,
+                            xp_budget: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Create a random encounter appropriate for the character's level"""
+    # Precomputed table of monsters appropriate for character level
+    table = encounter_tables.for_level(character_level)
+    rng = rng or rng_service.stream(ENCOUNTERS)
+
+    # Determine number of enemies based on character level
+    if character_level <= 2:
+        max_enemies = 2
+    else:
+        max_enemies = 3
+
+    if xp_budget is not None:
+        # A budget too small for any monster still gets one of the cheapest
+        monster_types = table.sample_group(rng, xp_budget, max_enemies) or [table.sample_cheapest(rng)]
+    else:
+        monster_types = [table.sample(rng) for _ in range(rng.randint(1, max_enemies))]
+
+    return [create_monster(monster_type, rng) for monster_type in monster_types]
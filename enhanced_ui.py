@@ -6,8 +6,12 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.layout import Layout
 from rich.box import ROUNDED, DOUBLE, HEAVY
-from typing import Dict, Any, List
+from rich.markup import escape
+from typing import Dict, Any, List, Optional
 from utils import console
+from combat_events import CombatLog, format_event
+
+COMBAT_LOG_LINES = 8
 
 class EnhancedUI:
     """Enhanced UI components for better game presentation"""
@@ -156,7 +160,8 @@ class EnhancedUI:
         bar = "█" * filled_length + "░" * (bar_length - filled_length)
         return f"{label}: [{color}]{bar}[/{color}] {current}/{maximum} ({percentage:.0f}%)"
     
-    def create_enhanced_combat_layout(self, character: Dict[str, Any], enemies: List[Dict[str, Any]], round_num: int) -> Layout:
+    def create_enhanced_combat_layout(self, character: Dict[str, Any], enemies: List[Dict[str, Any]], round_num: int,
+                                      combat_log: Optional[CombatLog] = None) -> Layout:
         """Create an enhanced combat layout"""
         layout = Layout()
         
@@ -203,7 +208,11 @@ class EnhancedUI:
         layout["actions"].update(self.create_action_panel(actions))
         
         # Combat log
-        log_text = "[dim]Combat log will appear here...[/dim]"
+        recent = combat_log.window(COMBAT_LOG_LINES) if combat_log is not None else []
+        if recent:
+            log_text = "\n".join(escape(format_event(event)) for event in recent)
+        else:
+            log_text = "[dim]Combat log will appear here...[/dim]"
         layout["log"].update(Panel(log_text, title="Combat Log", border_style=colors['secondary']))
         
         # Footer
@@ -212,9 +221,10 @@ class EnhancedUI:
         
         return layout
     
-    def display_enhanced_combat(self, character: Dict[str, Any], enemies: List[Dict[str, Any]], round_num: int):
+    def display_enhanced_combat(self, character: Dict[str, Any], enemies: List[Dict[str, Any]], round_num: int,
+                                combat_log: Optional[CombatLog] = None):
         """Display enhanced combat interface"""
-        layout = self.create_enhanced_combat_layout(character, enemies, round_num)
+        layout = self.create_enhanced_combat_layout(character, enemies, round_num, combat_log)
         self.console.print(layout)
     
     def create_dungeon_map(self, current_room: Dict[str, Any], visited_rooms: List[tuple]) -> str:
@@ -5,6 +5,7 @@ from typing import Dict, Optional
 from models import Character, Abilities
 from game_state import GameStateManager
 from utils import roll_ability_score
+from config import config
 
 class DnDRPG:
     """Main game class"""
@@ -78,6 +79,9 @@ class DnDRPG:
                 self.game_loop()
 
 def main():
+        if config.get("game", "watch_data", False):
+            from data_watcher import DataWatcher
+            DataWatcher(interval=config.get("game", "watch_interval", 1.0)).start()
         game = DnDRPG()
         game.run()
 
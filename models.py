@@ -34,6 +34,7 @@ class Character:
     experience: int = 0
     inventory: Dict[str, int] = field(default_factory=dict)
     spells: Optional[List[str]] = None
+    spell_slots: Optional[Dict] = None  # Slot ledger kept by spells.get_spell_slots
 
     def is_alive(self) -> bool:
         """Check if character is alive"""
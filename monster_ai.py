@@ -0,0 +1,107 @@
+"""
+Monster AI for D&D 3.5e RPG
+"""
+from typing import Callable, Dict, List, Optional, Set
+from combat_engine import Action, ActionType, CombatEngine, DecisionPolicy
+from combatant import Combatant
+from data_schema import MONSTER_BEHAVIORS
+
+DEFAULT_BEHAVIOR = "aggressive"
+FLEE_HP_FRACTION = 1 / 3  # flee_at_low_hp monsters run at or below a third of their hit points
+
+
+class RoundView:
+    """Combat state shared by all monster decisions in one round"""
+
+    __slots__ = ('opponents', 'weakest')
+
+    def __init__(self, engine: CombatEngine, member: Combatant):
+        self.opponents: List[Combatant] = engine.opponents_of(member)
+        self.weakest: Optional[Combatant] = (
+            min(self.opponents, key=lambda c: c.current_hp) if self.opponents else None
+        )
+
+
+Behavior = Callable[[CombatEngine, Combatant, RoundView], Action]
+
+BEHAVIORS: Dict[str, Behavior] = {}
+
+
+def register_behavior(name: str):
+    """Decorator registering a behavior function under a name"""
+    def decorator(function: Behavior) -> Behavior:
+        BEHAVIORS[name] = function
+        MONSTER_BEHAVIORS.add(name)  # Lets monsters.json name it
+        return function
+    return decorator
+
+
+def get_behavior(name: Optional[str]) -> Behavior:
+    """Look up a behavior by name (None means the default)"""
+    behavior = BEHAVIORS.get(name or DEFAULT_BEHAVIOR)
+    if behavior is None:
+        raise ValueError(f"Unknown monster behavior: {name}")
+    return behavior
+
+
+@register_behavior("aggressive")
+def aggressive(engine: CombatEngine, actor: Combatant, view: RoundView) -> Action:
+    """Attack the first opponent standing"""
+    return Action(ActionType.ATTACK, view.opponents[0])
+
+
+@register_behavior("focus_weakest")
+def focus_weakest(engine: CombatEngine, actor: Combatant, view: RoundView) -> Action:
+    """Attack the opponent with the fewest hit points"""
+    return Action(ActionType.ATTACK, view.weakest)
+
+
+@register_behavior("flee_at_low_hp")
+def flee_at_low_hp(engine: CombatEngine, actor: Combatant, view: RoundView) -> Action:
+    """Attack until badly hurt, then try to run away"""
+    if actor.current_hp <= actor.max_hp * FLEE_HP_FRACTION:
+        return Action(ActionType.FLEE)
+    return aggressive(engine, actor, view)
+
+
+@register_behavior("special_ability")
+def special_ability(engine: CombatEngine, actor: Combatant, view: RoundView) -> Action:
+    """Open with the monster's special_attack on the weakest opponent, then attack"""
+    if engine.special_uses_left(actor) > 0:
+        return Action(ActionType.SPECIAL_ATTACK, view.weakest)
+    return aggressive(engine, actor, view)
+
+
+class MonsterAIPolicy(DecisionPolicy):
+    """Plays every monster according to its behavior, planned once per round"""
+
+    def __init__(self):
+        self._engine: Optional[CombatEngine] = None
+        self._round = 0
+        self._plan: Dict[int, Action] = {}
+        self._hp_changes = 0  # engine.hp_changes when the plan was made
+
+    def plan_round(self, engine: CombatEngine, actor: Combatant,
+                   members: Optional[Set[int]] = None) -> Dict[int, Action]:
+        """Decide the actions of actor's living allies (only those in members, if given)"""
+        view = RoundView(engine, actor)
+        return {
+            monster.id: get_behavior(monster.behavior)(engine, monster, view)
+            for monster in engine.allies_of(actor)
+            if members is None or monster.id in members
+        }
+
+    def choose_action(self, engine: CombatEngine, actor: Combatant) -> Action:
+        if engine is not self._engine or engine.round != self._round:
+            self._engine, self._round = engine, engine.round
+            self._plan = self.plan_round(engine, actor)
+            self._hp_changes = engine.hp_changes
+        elif engine.hp_changes != self._hp_changes:
+            # Re-plan the monsters yet to act from one fresh view
+            self._plan = self.plan_round(engine, actor, set(self._plan) | {actor.id})
+            self._hp_changes = engine.hp_changes
+
+        action = self._plan.pop(actor.id, None)  # The plan keeps only monsters yet to act
+        if action is None:
+            action = get_behavior(actor.behavior)(engine, actor, RoundView(engine, actor))
+        return action
@@ -0,0 +1,134 @@
+"""
+Monster templates for D&D 3.5e RPG
+"""
+from collections.abc import MutableMapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Optional
+from data_loader import data_loader
+from data_schema import MonsterDef
+
+
+def freeze(value: Any) -> Any:
+    """Read-only deep copy of JSON data: dicts become mappings, lists become tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of frozen data"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class MonsterTemplate:
+    """Immutable, shared definition of a monster type"""
+
+    __slots__ = ('name', 'data', 'record')
+
+    def __init__(self, name: str, data: Mapping[str, Any], record: MonsterDef):
+        self.name = name
+        self.data = freeze(data)
+        self.record = record
+
+    def spawn(self, monster_id: int) -> 'MonsterInstance':
+        """Create a fresh monster of this type"""
+        return MonsterInstance(self, {'id': monster_id, 'current_hp': self.data['max_hp']})
+
+    def __repr__(self) -> str:
+        return f"MonsterTemplate({self.name!r})"
+
+
+class MonsterInstance(MutableMapping):
+    """A spawned monster: per-instance overlay over a shared template"""
+
+    __slots__ = ('template', 'overlay')
+
+    def __init__(self, template: MonsterTemplate, overlay: Optional[Dict[str, Any]] = None):
+        self.template = template
+        self.overlay = overlay if overlay is not None else {}
+
+    @property
+    def record(self) -> MonsterDef:
+        """The compiled record of the monster type"""
+        return self.template.record
+
+    def __getitem__(self, key: str) -> Any:
+        overlay = self.overlay
+        if key in overlay:
+            return overlay[key]
+        return self.template.data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self.overlay[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self.template.data:
+            raise TypeError(f"Cannot delete template field {key!r} of a monster")
+        del self.overlay[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.overlay or key in self.template.data
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.template.data
+        for key in self.overlay:
+            if key not in self.template.data:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.template.data) + sum(1 for key in self.overlay if key not in self.template.data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        overlay = self.overlay
+        if key in overlay:
+            return overlay[key]
+        return self.template.data.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain mutable dict with everything the monster has"""
+        data = thaw(self.template.data)
+        data.update(self.overlay)
+        return data
+
+    def __reduce__(self):
+        return (_rebuild_instance, (self.template.name, dict(self.overlay)))
+
+    def __repr__(self) -> str:
+        return f"MonsterInstance({self.template.name!r}, {self.overlay!r})"
+
+
+def _rebuild_instance(monster_type: str, overlay: Dict[str, Any]) -> MonsterInstance:
+    """Unpickle a MonsterInstance against this process's template pool"""
+    return MonsterInstance(monster_templates.get(monster_type), overlay)
+
+
+class TemplatePool:
+    """Interned monster templates built from data_loader.monsters"""
+
+    def __init__(self):
+        self._templates = data_loader.derived(dict, ["monsters"])
+
+    def get(self, monster_type: str) -> MonsterTemplate:
+        """The shared template of a monster type"""
+        templates: Dict[str, MonsterTemplate] = self._templates.get()
+        template = templates.get(monster_type)
+        if template is None:
+            # Raw data and record from the same load, so a reload can't mismatch them
+            monsters, records = data_loader.loaded("monsters")
+            template = MonsterTemplate(monster_type, monsters[monster_type], records[monster_type])
+            templates[monster_type] = template
+        return template
+
+    def clear(self):
+        """Forget all templates (instances keep the ones they were made from)"""
+        self._templates.invalidate()
+
+
+# Global template pool instance
+monster_templates = TemplatePool()
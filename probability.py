@@ -0,0 +1,202 @@
+"""
+Exact dice probability engine for D&D 3.5e RPG
+"""
+from functools import lru_cache
+from math import comb, sqrt
+from typing import Dict, Iterator, List, Tuple, Union
+from dice import DiceExpression, DiceTerm, compile_dice
+
+
+class Distribution:
+    """Probability distribution over a contiguous range of integer outcomes"""
+
+    __slots__ = ('offset', 'probs')
+
+    def __init__(self, offset: int, probs: Tuple[float, ...]):
+        self.offset = offset  # Value of probs[0]
+        self.probs = probs
+
+    @classmethod
+    def constant(cls, value: int) -> 'Distribution':
+        """Distribution that always yields value"""
+        return cls(value, (1.0,))
+
+    @classmethod
+    def from_weights(cls, weights: Dict[int, float]) -> 'Distribution':
+        """Build a normalized distribution from outcome -> weight"""
+        low, high = min(weights), max(weights)
+        total = float(sum(weights.values()))
+        return cls(low, tuple(weights.get(v, 0) / total for v in range(low, high + 1)))
+
+    @property
+    def minimum(self) -> int:
+        """Lowest possible outcome"""
+        return self.offset
+
+    @property
+    def maximum(self) -> int:
+        """Highest possible outcome"""
+        return self.offset + len(self.probs) - 1
+
+    def outcomes(self) -> Iterator[Tuple[int, float]]:
+        """Yield (value, probability) pairs with non-zero probability"""
+        for i, p in enumerate(self.probs):
+            if p:
+                yield self.offset + i, p
+
+    def prob(self, value: int) -> float:
+        """Probability of exactly value"""
+        i = value - self.offset
+        return self.probs[i] if 0 <= i < len(self.probs) else 0.0
+
+    def cdf(self, value: int) -> float:
+        """Probability of a result less than or equal to value"""
+        i = value - self.offset
+        if i < 0:
+            return 0.0
+        return min(1.0, sum(self.probs[:i + 1]))
+
+    def prob_at_least(self, value: int) -> float:
+        """Probability of a result greater than or equal to value"""
+        return max(0.0, 1.0 - self.cdf(value - 1))
+
+    @property
+    def mean(self) -> float:
+        """Expected value"""
+        return sum(v * p for v, p in self.outcomes())
+
+    @property
+    def variance(self) -> float:
+        """Variance of the outcome"""
+        mean = self.mean
+        return sum((v - mean) ** 2 * p for v, p in self.outcomes())
+
+    @property
+    def std(self) -> float:
+        """Standard deviation of the outcome"""
+        return sqrt(self.variance)
+
+    def percentile(self, q: float) -> int:
+        """Smallest outcome whose cumulative probability reaches q (0-100)"""
+        target = q / 100.0
+        cumulative = 0.0
+        for v, p in self.outcomes():
+            cumulative += p
+            if cumulative >= target - 1e-12:
+                return v
+        return self.maximum
+
+    def clamp(self, low: int) -> 'Distribution':
+        """Fold all outcomes below low onto low (e.g. damage never below 0)"""
+        if self.offset >= low:
+            return self
+        cut = low - self.offset
+        head = sum(self.probs[:cut + 1]) if cut < len(self.probs) else sum(self.probs)
+        return Distribution(low, (head,) + self.probs[cut + 1:])
+
+    def mix(self, other: 'Distribution', weight: float) -> 'Distribution':
+        """Return self with probability weight, other otherwise"""
+        low = min(self.minimum, other.minimum)
+        high = max(self.maximum, other.maximum)
+        return Distribution(low, tuple(
+            weight * self.prob(v) + (1 - weight) * other.prob(v) for v in range(low, high + 1)))
+
+    def __add__(self, other: Union['Distribution', int]) -> 'Distribution':
+        """Distribution of the sum of two independent outcomes"""
+        if isinstance(other, int):
+            return Distribution(self.offset + other, self.probs)
+        result = [0.0] * (len(self.probs) + len(other.probs) - 1)
+        for i, p in enumerate(self.probs):
+            if p:
+                for j, q in enumerate(other.probs):
+                    result[i + j] += p * q
+        return Distribution(self.offset + other.offset, tuple(result))
+
+    def __neg__(self) -> 'Distribution':
+        return Distribution(-self.maximum, tuple(reversed(self.probs)))
+
+    def __repr__(self) -> str:
+        return f"Distribution(min={self.minimum}, max={self.maximum}, mean={self.mean:.3f})"
+
+
+def _die(sides: int) -> Distribution:
+    """Distribution of a single die"""
+    return Distribution(1, (1.0 / sides,) * sides)
+
+
+def _keep_distribution(term: DiceTerm) -> Distribution:
+    """Distribution of a keep/drop term, by dynamic programming over face values"""
+    # Faces from the kept end: the first `keep` dice placed are the ones kept
+    faces = range(term.sides, 0, -1) if term.keep_highest else range(1, term.sides + 1)
+    # (dice placed, kept total) -> number of ordered rolls
+    ways: Dict[Tuple[int, int], int] = {(0, 0): 1}
+    for face in faces:
+        step: Dict[Tuple[int, int], int] = {}
+        for (placed, total), count in ways.items():
+            free = term.count - placed
+            for showing in range(free + 1):
+                kept = min(showing, max(0, term.keep - placed))
+                key = (placed + showing, total + kept * face)
+                step[key] = step.get(key, 0) + count * comb(free, showing)
+        ways = step
+    return Distribution.from_weights(
+        {total: count for (placed, total), count in ways.items() if placed == term.count})
+
+
+def _term_distribution(term: DiceTerm) -> Distribution:
+    """Distribution of a single dice term, including its sign"""
+    if term.is_plain:
+        result = _die(term.sides)
+        for _ in range(term.count - 1):
+            result = result + _die(term.sides)
+    else:
+        result = _keep_distribution(term)
+    return result if term.sign > 0 else -result
+
+
+@lru_cache(maxsize=1024)
+def _expression_distribution(expression: DiceExpression) -> Distribution:
+    result = Distribution.constant(expression.modifier)
+    for term in expression.terms:
+        result = result + _term_distribution(term)
+    return result
+
+
+def dice_distribution(dice: Union[str, DiceExpression]) -> Distribution:
+    """Exact outcome distribution of a dice expression (memoized)"""
+    if not isinstance(dice, DiceExpression):
+        dice = compile_dice(dice)
+    return _expression_distribution(dice)
+
+
+def hit_chance(attack_bonus: int, armor_class: int) -> float:
+    """Probability that 1d20 + attack_bonus meets or beats armor_class"""
+    return min(1.0, max(0.0, (21 - (armor_class - attack_bonus)) / 20.0))
+
+
+@lru_cache(maxsize=4096)
+def attack_damage_distribution(attack_bonus: int, armor_class: int,
+                               damage: Union[str, DiceExpression], damage_bonus: int = 0) -> Distribution:
+    """Damage dealt by a single attack, with a miss counting as 0 damage"""
+    on_hit = (dice_distribution(damage) + damage_bonus).clamp(0)
+    return on_hit.mix(Distribution.constant(0), hit_chance(attack_bonus, armor_class))
+
+
+def expected_damage(attack_bonus: int, armor_class: int,
+                    damage: Union[str, DiceExpression], damage_bonus: int = 0) -> float:
+    """Average damage per attack, including misses"""
+    return attack_damage_distribution(attack_bonus, armor_class, damage, damage_bonus).mean
+
+
+def summarize(dice: Union[str, DiceExpression], percentiles: List[float] = (10, 50, 90)) -> Dict[str, float]:
+    """Mean, variance and selected percentiles of a dice expression"""
+    dist = dice_distribution(dice)
+    summary = {
+        "min": dist.minimum,
+        "max": dist.maximum,
+        "mean": dist.mean,
+        "variance": dist.variance,
+    }
+    for q in percentiles:
+        summary[f"p{q:g}"] = dist.percentile(q)
+    return summary
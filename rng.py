@@ -0,0 +1,76 @@
+"""
+Seeded random number streams for D&D 3.5e RPG
+"""
+import hashlib
+import random
+import secrets
+import threading
+from typing import Dict, Optional
+from config import config
+
+try:
+    import numpy as np
+except ImportError:  # NumPy generators are unavailable without NumPy
+    np = None
+
+# Well-known stream names
+DICE = "dice"
+ATTACKS = "attacks"
+ENCOUNTERS = "encounters"
+DUNGEON = "dungeon"
+LOOT = "loot"
+
+
+class RNGService:
+    """Root seed plus independent named random streams"""
+
+    def __init__(self, seed: Optional[int] = None, path: str = ""):
+        self.seed = seed if seed is not None else secrets.randbits(64)
+        self.path = path
+        self._streams: Dict[str, random.Random] = {}
+        self._generators: Dict[str, "np.random.Generator"] = {}
+        self._lock = threading.Lock()
+
+    def derive_seed(self, name: str) -> int:
+        """Deterministic 64-bit seed for a named stream under this service"""
+        key = f"{self.seed}:{self.path}/{name}".encode()
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+    def stream(self, name: str) -> random.Random:
+        """Get the random.Random stream with the given name"""
+        rng = self._streams.get(name)
+        if rng is None:
+            with self._lock:
+                rng = self._streams.get(name)
+                if rng is None:
+                    rng = random.Random(self.derive_seed(name))
+                    self._streams[name] = rng
+        return rng
+
+    def generator(self, name: str) -> "np.random.Generator":
+        """Get the NumPy generator with the given name, for batch rolling"""
+        if np is None:
+            raise ImportError("NumPy generators require NumPy (pip install numpy)")
+        gen = self._generators.get(name)
+        if gen is None:
+            with self._lock:
+                gen = self._generators.get(name)
+                if gen is None:
+                    gen = np.random.default_rng(self.derive_seed(name))
+                    self._generators[name] = gen
+        return gen
+
+    def spawn(self, name: str) -> 'RNGService':
+        """Create an independent child service, e.g. one per worker"""
+        return RNGService(self.seed, f"{self.path}/{name}")
+
+    def reseed(self, seed: Optional[int] = None):
+        """Reset the root seed and discard all existing streams"""
+        with self._lock:
+            self.seed = seed if seed is not None else secrets.randbits(64)
+            self._streams = {}
+            self._generators = {}
+
+
+# Global RNG service, seeded from the "game" config section when set
+rng_service = RNGService(config.get("game", "seed"))
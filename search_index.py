@@ -0,0 +1,222 @@
+"""
+Full-text search for D&D 3.5e RPG
+"""
+import re
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Descriptive fields indexed for each kind of entry, besides the name
+INDEXED_FIELDS = {
+    "spell": ("school", "subschool", "description", "effect", "damage_type", "status_type",
+              "buff_type", "class", "target", "range", "duration"),
+    "monster": ("description", "special_abilities", "special_attack", "behavior", "equipment"),
+    "race": ("description", "traits", "favored_class"),
+    "class": ("description", "base_attack", "class_features")
+}
+
+NAME_WEIGHT = 3.0  # A word in the name counts three times a word in the text
+PREFIX_FACTOR = 0.5
+FUZZY_FACTOR = 0.3
+MIN_FUZZY_LENGTH = 4  # Shorter words match too many others within one edit
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+Document = Tuple[str, str]  # (kind, name)
+
+
+@dataclass
+class SearchResult:
+    """One matching entry"""
+    kind: str
+    name: str
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a text"""
+    return _WORD.findall(text.lower())
+
+
+def _texts(value: Any) -> Iterator[str]:
+    """All strings inside a JSON value"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _texts(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _texts(item)
+
+
+def _deletions(word: str) -> Set[str]:
+    """The word with each single character removed"""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion, substitution or transposition"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        i, j = diffs[0], diffs[-1]
+        return len(diffs) == 2 and j == i + 1 and a[i] == b[j] and a[j] == b[i]
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+class SearchIndex:
+    """Inverted index with exact, prefix and fuzzy word matching"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Document, float]] = {}
+        self._doc_words: Dict[Document, Counter] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._names: Dict[str, List[Document]] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None  # Sorted, rebuilt after changes
+
+    def __len__(self) -> int:
+        return len(self._doc_words)
+
+    def update(self, kind: str, entries: Dict[str, Dict[str, Any]]):
+        """Bring one kind of entry up to date, re-indexing only what changed"""
+        old = self._entries.get(kind, {})
+        for name in old.keys() - entries.keys():
+            self._remove((kind, name))
+        for name, entry in entries.items():
+            previous = old.get(name)
+            if previous is entry or previous == entry:
+                continue
+            if previous is not None:
+                self._remove((kind, name))
+            self._add((kind, name), entry)
+        self._entries[kind] = dict(entries)
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+
+    def entry(self, kind: str, name: str) -> Optional[Dict[str, Any]]:
+        """Data of an indexed entry"""
+        return self._entries.get(kind, {}).get(name)
+
+    def _add(self, doc: Document, entry: Dict[str, Any]):
+        kind, name = doc
+        words = Counter()
+        for word in tokenize(name):
+            words[word] += NAME_WEIGHT
+        for field in INDEXED_FIELDS.get(kind, ("description",)):
+            for text in _texts(entry.get(field)):
+                words.update(tokenize(text))
+
+        self._doc_words[doc] = words
+        for word, weight in words.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                self._vocabulary = None
+                for variant in _deletions(word):
+                    self._deletes.setdefault(variant, set()).add(word)
+            postings[doc] = weight
+        self._names.setdefault(name.lower(), []).append(doc)
+
+    def _remove(self, doc: Document):
+        words = self._doc_words.pop(doc, None)
+        if words is None:
+            return
+        for word in words:
+            postings = self._postings[word]
+            del postings[doc]
+            if not postings:
+                del self._postings[word]
+                self._vocabulary = None
+                for variant in _deletions(word):
+                    self._deletes[variant].discard(word)
+                    if not self._deletes[variant]:
+                        del self._deletes[variant]
+        docs = self._names[doc[1].lower()]
+        docs.remove(doc)
+        if not docs:
+            del self._names[doc[1].lower()]
+
+    def _prefixed(self, prefix: str) -> Iterator[str]:
+        """Vocabulary words starting with prefix (other than prefix itself)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            if vocabulary[i] != prefix:
+                yield vocabulary[i]
+            i += 1
+
+    def _similar(self, word: str) -> Set[str]:
+        """Vocabulary words within one edit of word"""
+        if len(word) < MIN_FUZZY_LENGTH:
+            return set()
+        # Deleting at most one letter from both sides catches every word within one edit
+        candidates: Set[str] = set()
+        for variant in _deletions(word) | {word}:
+            if variant in self._postings:
+                candidates.add(variant)
+            candidates.update(self._deletes.get(variant, ()))
+        candidates.discard(word)
+        return {candidate for candidate in candidates if _within_one_edit(word, candidate)}
+
+    def _matches(self, word: str) -> List[Tuple[Dict[Document, float], float]]:
+        """(postings, score factor) of every vocabulary word matching one query word"""
+        matches = [(self._postings[word], 1.0)] if word in self._postings else []
+        matches += [(self._postings[match], PREFIX_FACTOR) for match in self._prefixed(word)]
+        matches += [(self._postings[match], FUZZY_FACTOR) for match in self._similar(word)]
+        return matches
+
+    @staticmethod
+    def _score(doc: Document, matches: List[Tuple[Dict[Document, float], float]]) -> float:
+        """Best score of a document for one query word (0 if it does not match)"""
+        return max((postings.get(doc, 0.0) * factor for postings, factor in matches), default=0.0)
+
+    def search(self, query: str, kinds: Optional[Iterable[str]] = None, limit: int = 10) -> List[SearchResult]:
+        """Entries matching every word of the query, best first"""
+        words = tokenize(query)
+        if not words:
+            return []
+        kinds = set(kinds) if kinds is not None else None
+
+        # Start from the rarest word and only check its documents against the others
+        per_word = sorted((self._matches(word) for word in words),
+                          key=lambda matches: sum(len(postings) for postings, _ in matches))
+        totals: Dict[Document, float] = {}
+        for postings, factor in per_word[0]:
+            for doc, weight in postings.items():
+                if weight * factor > totals.get(doc, 0.0):
+                    totals[doc] = weight * factor
+        for matches in per_word[1:]:
+            scores = {doc: self._score(doc, matches) for doc in totals}
+            totals = {doc: total + scores[doc] for doc, total in totals.items() if scores[doc] > 0}
+            if not totals:
+                return []
+
+        ranked = sorted(
+            (SearchResult(kind, name, score) for (kind, name), score in totals.items()
+             if kinds is None or kind in kinds),
+            key=lambda result: (-result.score, result.kind, result.name)
+        )
+        return ranked[:limit]
+
+    def lookup(self, name: str, kind: Optional[str] = None) -> Optional[SearchResult]:
+        """The entry with this name, or else the best search match"""
+        for doc_kind, doc_name in self._names.get(name.strip().lower(), []):
+            if kind is None or doc_kind == kind:
+                return SearchResult(doc_kind, doc_name, float("inf"))
+        results = self.search(name, [kind] if kind else None, limit=1)
+        return results[0] if results else None
@@ -0,0 +1,206 @@
+"""
+Monte Carlo encounter simulator for D&D 3.5e RPG
+"""
+import argparse
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from math import sqrt
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from combat_engine import AttackWeakestPolicy, CombatEngine, DecisionPolicy
+from combat_events import CombatLog
+from monster_ai import MonsterAIPolicy
+from rng import RNGService, ATTACKS, ENCOUNTERS
+
+# D&D 3.5e elite array in strength, dexterity, constitution, intelligence, wisdom, charisma order
+DEFAULT_ABILITIES = {
+    'strength': 15, 'dexterity': 14, 'constitution': 13,
+    'intelligence': 12, 'wisdom': 10, 'charisma': 8
+}
+
+CHUNK_SIZE = 250
+MAX_ROUNDS = 100
+
+# Per-trial result: (outcome, rounds, hp_remaining)
+TrialResult = Tuple[str, int, int]
+
+
+@dataclass
+class SimulationReport:
+    """Aggregated outcome of a batch of simulated fights"""
+    trials: int
+    wins: int
+    defeats: int
+    fled: int
+    win_rate: float
+    win_rate_ci: Tuple[float, float]
+    death_probability: float
+    death_probability_ci: Tuple[float, float]
+    mean_rounds: float
+    mean_rounds_ci: Tuple[float, float]
+    mean_hp_remaining: float
+    mean_hp_remaining_ci: Tuple[float, float]
+
+    def format(self) -> str:
+        """Human readable summary"""
+        return "\n".join([
+            f"Trials:            {self.trials}",
+            f"Win rate:          {self.win_rate:.1%} ({self.win_rate_ci[0]:.1%} - {self.win_rate_ci[1]:.1%})",
+            f"Death probability: {self.death_probability:.1%} "
+            f"({self.death_probability_ci[0]:.1%} - {self.death_probability_ci[1]:.1%})",
+            f"Fled:              {self.fled}",
+            f"Rounds:            {self.mean_rounds:.2f} ({self.mean_rounds_ci[0]:.2f} - {self.mean_rounds_ci[1]:.2f})",
+            f"HP remaining:      {self.mean_hp_remaining:.2f} "
+            f"({self.mean_hp_remaining_ci[0]:.2f} - {self.mean_hp_remaining_ci[1]:.2f})",
+        ])
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion"""
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def mean_interval(values: Sequence[float], confidence: float = 0.95) -> Tuple[float, Tuple[float, float]]:
+    """Sample mean with a normal-approximation confidence interval"""
+    n = len(values)
+    if n == 0:
+        return 0.0, (0.0, 0.0)
+    mean = sum(values) / n
+    if n == 1:
+        return mean, (mean, mean)
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    margin = NormalDist().inv_cdf(0.5 + confidence / 2) * sqrt(variance / n)
+    return mean, (mean - margin, mean + margin)
+
+
+def run_trials(character: Dict[str, Any], monster_types: Optional[List[str]], trials: int,
+               seed: int, path: str, player_policy: Optional[DecisionPolicy] = None,
+               enemy_policy: Optional[DecisionPolicy] = None) -> List[TrialResult]:
+    """Play a chunk of fights with its own RNG streams (runs inside a worker)"""
+    from encounters import create_monster, create_random_encounter
+
+    rng = RNGService(seed, path)
+    attack_rng = rng.stream(ATTACKS)
+    encounter_rng = rng.stream(ENCOUNTERS)
+    player_policy = player_policy or AttackWeakestPolicy()
+    enemy_policy = enemy_policy or MonsterAIPolicy()
+    no_log = CombatLog(capacity=0)  # Only outcomes are needed, skip building events
+
+    results = []
+    for _ in range(trials):
+        hero = copy.deepcopy(character)
+        if monster_types:
+            enemies = [create_monster(monster_type, encounter_rng) for monster_type in monster_types]
+        else:
+            enemies = create_random_encounter(hero['level'], encounter_rng)
+
+        engine = CombatEngine([hero], enemies, player_policy, enemy_policy,
+                              rng=attack_rng, max_rounds=MAX_ROUNDS, log=no_log)
+        result = engine.run()
+        results.append((result.outcome, result.rounds, hero['current_hp']))
+    return results
+
+
+def summarize_trials(results: List[TrialResult], confidence: float = 0.95) -> SimulationReport:
+    """Turn raw trial results into a SimulationReport"""
+    trials = len(results)
+    wins = sum(1 for outcome, _, _ in results if outcome == "victory")
+    defeats = sum(1 for outcome, _, _ in results if outcome == "defeat")
+    fled = sum(1 for outcome, _, _ in results if outcome == "fled")
+    mean_rounds, rounds_ci = mean_interval([r for _, r, _ in results], confidence)
+    mean_hp, hp_ci = mean_interval([hp for _, _, hp in results], confidence)
+
+    return SimulationReport(
+        trials=trials,
+        wins=wins,
+        defeats=defeats,
+        fled=fled,
+        win_rate=wins / trials if trials else 0.0,
+        win_rate_ci=wilson_interval(wins, trials, confidence),
+        death_probability=defeats / trials if trials else 0.0,
+        death_probability_ci=wilson_interval(defeats, trials, confidence),
+        mean_rounds=mean_rounds,
+        mean_rounds_ci=rounds_ci,
+        mean_hp_remaining=mean_hp,
+        mean_hp_remaining_ci=hp_ci,
+    )
+
+
+def simulate_encounter(character: Dict[str, Any], monster_types: Optional[List[str]] = None,
+                       trials: int = 1000, workers: Optional[int] = None, seed: Optional[int] = None,
+                       player_policy: Optional[DecisionPolicy] = None,
+                       enemy_policy: Optional[DecisionPolicy] = None,
+                       confidence: float = 0.95) -> SimulationReport:
+    """
+    Estimate the outcome of a fight by playing it many times.
+
+    monster_types lists the monsters to fight (e.g. ["Goblin", "Goblin"]);
+    when omitted each trial fights a fresh create_random_encounter group.
+    workers defaults to the number of CPUs; 1 runs everything in-process.
+    """
+    root = RNGService(seed)
+    chunks = []
+    for index, start in enumerate(range(0, trials, CHUNK_SIZE)):
+        chunks.append((min(CHUNK_SIZE, trials - start), f"/chunk-{index}"))
+
+    workers = workers or os.cpu_count() or 1
+    results: List[TrialResult] = []
+    if workers == 1 or len(chunks) == 1:
+        for size, path in chunks:
+            results.extend(run_trials(character, monster_types, size, root.seed, path,
+                                      player_policy, enemy_policy))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(run_trials, character, monster_types, size, root.seed, path,
+                            player_policy, enemy_policy)
+                for size, path in chunks
+            ]
+            for future in futures:
+                results.extend(future.result())
+
+    return summarize_trials(results, confidence)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate an encounter many times")
+    parser.add_argument("--race", default="Human")
+    parser.add_argument("--class", dest="character_class", default="Fighter")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--abilities", type=int, nargs=6, metavar="SCORE",
+                        help="STR DEX CON INT WIS CHA (default: elite array)")
+    parser.add_argument("--monsters", nargs="*", help="Monster types to fight (default: random encounters)")
+    parser.add_argument("--trials", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--advisor", action="store_true", help="Play the character with the action advisor")
+    args = parser.parse_args()
+
+    from character_rules import build_character
+
+    abilities = DEFAULT_ABILITIES
+    if args.abilities:
+        abilities = dict(zip(DEFAULT_ABILITIES, args.abilities))
+    character = build_character("Simulated Hero", args.race, args.character_class, abilities, args.level)
+
+    player_policy = None
+    if args.advisor:
+        from advisor import AdvisorPolicy
+        player_policy = AdvisorPolicy()
+
+    report = simulate_encounter(character, args.monsters, args.trials, args.workers, args.seed,
+                                player_policy=player_policy)
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
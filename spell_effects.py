@@ -0,0 +1,280 @@
+"""
+Spell effects for D&D 3.5e RPG
+"""
+import random
+from typing import Any, Dict, List, Optional, Tuple, Type
+from data_loader import data_loader
+from data_schema import SpellDef
+from dice import compile_dice, np
+from rng import rng_service, DICE
+
+# (success, message, effect_value), as returned by spells.cast_spell
+CastResult = Tuple[bool, str, Optional[int]]
+# (success, message, total effect_value, effect_value per target), as returned by spells.cast_area_spell
+AreaCastResult = Tuple[bool, str, Optional[int], List[Optional[int]]]
+
+# Ability that grants bonus spells and sets save DCs for each casting class
+CASTING_ABILITY = {
+    "Cleric": "wisdom",
+    "Wizard": "intelligence"
+}
+
+# Ability modifier used as the bonus of each saving throw
+SAVE_ABILITY = {
+    "fortitude": "constitution",
+    "reflex": "dexterity",
+    "will": "wisdom"
+}
+
+BATCH_SAVE_MIN_TARGETS = 8  # Below this, rolling saves one by one is faster than a batch
+D20 = compile_dice("1d20")
+
+EFFECTS: Dict[str, Type['SpellEffect']] = {}
+_effects_version = 0  # Bumped on every registration so compiled spells pick it up
+
+
+def register_effect(name: str):
+    """Class decorator registering a SpellEffect for spells with "effect": name"""
+    def decorator(effect_class: Type['SpellEffect']) -> Type['SpellEffect']:
+        global _effects_version
+        EFFECTS[name] = effect_class
+        _effects_version += 1
+        return effect_class
+    return decorator
+
+
+def _ability_modifier(creature: Dict[str, Any], ability: str) -> int:
+    return (creature.get("abilities", {}).get(ability, 10) - 10) // 2
+
+
+def parse_saving_throw(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """(save type, outcome) from text like "Reflex half"; (None, None) for no or harmless saves"""
+    words = text.lower().replace("(", " ").replace(")", " ").split()
+    if not words or words[0] not in SAVE_ABILITY or "harmless" in words:
+        return None, None
+    outcome = "half" if "half" in words else "negates" if "negates" in words else None
+    return words[0], outcome
+
+
+def save_bonus(creature: Dict[str, Any], save: str) -> int:
+    """Bonus of a creature on a saving throw"""
+    return _ability_modifier(creature, SAVE_ABILITY[save])
+
+
+def save_dc(caster: Dict[str, Any], spell_level: int) -> int:
+    """Saving throw DC of the caster's spells of a level"""
+    ability = CASTING_ABILITY.get(caster.get("class"))
+    return 10 + spell_level + (_ability_modifier(caster, ability) if ability else 0)
+
+
+def roll_saves(targets: List[Dict[str, Any]], save: str, dc: int, rng: random.Random) -> List[bool]:
+    """Roll a saving throw for every target; True where the save succeeds"""
+    bonuses = [save_bonus(target, save) for target in targets]
+    if np is not None and len(targets) >= BATCH_SAVE_MIN_TARGETS:
+        # One batch from a generator seeded off rng, so results still follow the seed
+        generator = np.random.default_rng(rng.getrandbits(64))
+        totals = D20.roll_batch(len(targets), generator) + np.asarray(bonuses, dtype=np.int64)
+        return (totals >= dc).tolist()
+    return [D20.roll(rng) + bonus >= dc for bonus in bonuses]
+
+
+class SpellEffect:
+    """What a spell does when cast; subclasses read the spell record once in __init__"""
+
+    requires_target = False  # Casting fails without a target
+    targets_caster = False  # Without a target the caster is affected
+
+    def __init__(self, spell: SpellDef):
+        self.spell_name = spell.name
+        self.level = spell.level
+        self.save, self.save_outcome = parse_saving_throw(spell.saving_throw)
+
+    def cast(self, caster: Dict[str, Any], target: Optional[Dict[str, Any]],
+             rng: Optional[random.Random] = None) -> CastResult:
+        """Check the target and apply the effect"""
+        if target is None:
+            if self.requires_target:
+                return False, f"{self.spell_name} requires a target", None
+            if self.targets_caster:
+                target = caster
+        message, value = self.apply(caster, target, rng or rng_service.stream(DICE))
+        return True, message, value
+
+    def apply(self, caster: Dict[str, Any], target: Optional[Dict[str, Any]],
+              rng: random.Random) -> Tuple[str, Optional[int]]:
+        """Apply the effect and return (message, effect_value)"""
+        return f"{caster['name']} casts {self.spell_name}!", None
+
+    def cast_area(self, caster: Dict[str, Any], targets: List[Dict[str, Any]],
+                  rng: Optional[random.Random] = None) -> AreaCastResult:
+        """Apply the effect to every target in the area"""
+        if not targets:
+            return False, f"{self.spell_name} has no targets", None, []
+        rng = rng or rng_service.stream(DICE)
+        if self.save is None:
+            saves = [False] * len(targets)
+        else:
+            saves = roll_saves(targets, self.save, save_dc(caster, self.level), rng)
+        values = self.apply_area(caster, targets, saves, rng)
+        numbers = [value for value in values if value is not None]
+        total = sum(numbers) if numbers else None
+        return True, self.describe_area(caster, targets, saves, values), total, values
+
+    def apply_area(self, caster: Dict[str, Any], targets: List[Dict[str, Any]],
+                   saves: List[bool], rng: random.Random) -> List[Optional[int]]:
+        """Apply the effect to each target and return the effect value per target"""
+        return [self.apply(caster, target, rng)[1] for target in targets]
+
+    def describe_area(self, caster: Dict[str, Any], targets: List[Dict[str, Any]],
+                      saves: List[bool], values: List[Optional[int]]) -> str:
+        """One message for the whole area"""
+        names = ", ".join(target["name"] for target in targets)
+        return f"{caster['name']} casts {self.spell_name} on {names}!"
+
+
+@register_effect("utility")
+class UtilityEffect(SpellEffect):
+    """No mechanical effect in combat"""
+
+
+@register_effect("heal")
+class HealEffect(SpellEffect):
+    """Restore hit points, up to the maximum"""
+
+    targets_caster = True
+
+    def __init__(self, spell: SpellDef):
+        super().__init__(spell)
+        self.amount = spell.heal_amount
+
+    def apply(self, caster, target, rng):
+        heal_amount = self.amount.roll(rng)
+        old_hp = target["current_hp"]
+        target["current_hp"] = min(target["max_hp"], target["current_hp"] + heal_amount)
+        actual_heal = target["current_hp"] - old_hp
+        return f"{caster['name']} casts {self.spell_name} on {target['name']}, healing {actual_heal} hit points!", actual_heal
+
+
+@register_effect("damage")
+class DamageEffect(SpellEffect):
+    """Deal damage to the target"""
+
+    requires_target = True
+
+    def __init__(self, spell: SpellDef):
+        super().__init__(spell)
+        self.amount = spell.damage_amount
+        self.damage_type = spell.damage_type or "magical"
+
+    def apply(self, caster, target, rng):
+        damage_amount = self.amount.roll(rng)
+        old_hp = target["current_hp"]
+        target["current_hp"] = max(0, target["current_hp"] - damage_amount)
+        actual_damage = old_hp - target["current_hp"]
+        return (f"{caster['name']} casts {self.spell_name} on {target['name']}, "
+                f"dealing {actual_damage} {self.damage_type} damage!"), actual_damage
+
+    def apply_area(self, caster, targets, saves, rng):
+        # One damage roll for the whole area, halved or negated by a save
+        damage_amount = self.amount.roll(rng)
+        values = []
+        for target, saved in zip(targets, saves):
+            damage = damage_amount
+            if saved:
+                damage = damage // 2 if self.save_outcome == "half" else 0
+            old_hp = target["current_hp"]
+            target["current_hp"] = max(0, old_hp - damage)
+            values.append(old_hp - target["current_hp"])
+        return values
+
+    def describe_area(self, caster, targets, saves, values):
+        parts = [
+            f"{target['name']} takes {value}" + (" (saved)" if saved else "")
+            for target, saved, value in zip(targets, saves, values)
+        ]
+        return f"{caster['name']} casts {self.spell_name} for {self.damage_type} damage: {', '.join(parts)}!"
+
+
+@register_effect("buff")
+class BuffEffect(SpellEffect):
+    """Grant a bonus"""
+
+    targets_caster = True
+
+    def __init__(self, spell: SpellDef):
+        super().__init__(spell)
+        self.buff_type = spell.buff_type or "general"
+        self.bonus = spell.bonus if spell.bonus is not None else 1
+
+    def apply(self, caster, target, rng):
+        return (f"{caster['name']} casts {self.spell_name} on {target['name']}, "
+                f"granting a +{self.bonus} {self.buff_type} bonus!"), self.bonus
+
+
+@register_effect("status")
+class StatusEffect(SpellEffect):
+    """Apply a condition to the target"""
+
+    requires_target = True
+
+    def __init__(self, spell: SpellDef):
+        super().__init__(spell)
+        self.status_type = spell.status_type or "special"
+
+    def apply(self, caster, target, rng):
+        return (f"{caster['name']} casts {self.spell_name} on {target['name']}, "
+                f"applying {self.status_type} effect!"), None
+
+    def apply_area(self, caster, targets, saves, rng):
+        # A successful save negates the effect; 1 marks an affected target
+        return [0 if saved else 1 for saved in saves]
+
+    def describe_area(self, caster, targets, saves, values):
+        affected = [t["name"] for t, value in zip(targets, values) if value]
+        resisted = [t["name"] for t, value in zip(targets, values) if not value]
+        message = f"{caster['name']} casts {self.spell_name}"
+        if affected:
+            message += f", applying {self.status_type} effect to {', '.join(affected)}"
+        if resisted:
+            message += f"; {', '.join(resisted)} resist{'s' if len(resisted) == 1 else ''}"
+        return message + "!"
+
+
+class CompiledSpell:
+    """A spell with its effect object ready to cast"""
+
+    __slots__ = ('name', 'level', 'area_effect', 'effect', 'record')
+
+    def __init__(self, spell: SpellDef):
+        self.name = spell.name
+        self.level = spell.level
+        self.area_effect = spell.area_effect
+        self.effect = EFFECTS.get(spell.effect, UtilityEffect)(spell)
+        self.record = spell
+
+
+class CompiledSpells:
+    """All spells compiled once; recompiled after a reload or a new register_effect"""
+
+    def __init__(self):
+        self._compiled = data_loader.derived(self._compile, ["spells"])
+
+    def _compile(self) -> Tuple[int, Dict[str, CompiledSpell]]:
+        """(effects version, compiled spells) from the current spell records"""
+        return _effects_version, {name: CompiledSpell(spell) for name, spell in data_loader.spell_defs.items()}
+
+    def invalidate(self):
+        """Recompile on next use"""
+        self._compiled.invalidate()
+
+    def get(self, spell_name: str) -> Optional[CompiledSpell]:
+        """The compiled spell, or None for an unknown spell"""
+        effects_version, spells = self._compiled.get()
+        if effects_version != _effects_version:
+            self._compiled.invalidate()
+            effects_version, spells = self._compiled.get()
+        return spells.get(spell_name)
+
+
+# Global compiled spell table
+compiled_spells = CompiledSpells()
@@ -3,12 +3,12 @@ Spellcasting system for D&D 3.5e RPG
 """
 import random
 from typing import Dict, Any, List, Optional, Tuple
-from utils import roll_dice, console, print_choice_menu, Prompt
 from data_loader import data_loader
 from config import config
+from spell_effects import CASTING_ABILITY, compiled_spells
 
-# Get spell data from data loader
-SPELLS = data_loader.spells
+# Live view of the spell data, follows reloads
+SPELLS = data_loader.view("spells")
 
 # Spell slots by class and level
 SPELL_SLOTS = {
@@ -28,15 +28,60 @@ SPELL_SLOTS = {
     }
 }
 
+class SpellIndex:
+    """Spell names grouped by (class, level), class, school and effect, in data file order"""
+    
+    def __init__(self):
+        self._groups = data_loader.derived(self.build, ["spells"])
+    
+    def invalidate(self):
+        """Mark the index for rebuilding from the current spell data"""
+        self._groups.invalidate()
+    
+    def build(self) -> Dict[str, Dict[Any, Tuple[str, ...]]]:
+        """Build every grouping in one pass over data_loader.spells"""
+        groups = {'class_level': {}, 'class': {}, 'school': {}, 'effect': {}}
+        for spell_name, spell_data in data_loader.spells.items():
+            keys = {
+                'class_level': (spell_data["class"], spell_data["level"]),
+                'class': spell_data["class"],
+                'school': spell_data.get("school"),
+                'effect': spell_data.get("effect")
+            }
+            for group, key in keys.items():
+                groups[group].setdefault(key, []).append(spell_name)
+        return {group: {key: tuple(names) for key, names in keyed.items()} for group, keyed in groups.items()}
+    
+    def for_class_level(self, character_class: str, spell_level: int) -> Tuple[str, ...]:
+        return self._groups.get()['class_level'].get((character_class, spell_level), ())
+    
+    def for_class(self, character_class: str) -> Tuple[str, ...]:
+        return self._groups.get()['class'].get(character_class, ())
+    
+    def for_school(self, school: str) -> Tuple[str, ...]:
+        return self._groups.get()['school'].get(school, ())
+    
+    def for_effect(self, effect: str) -> Tuple[str, ...]:
+        return self._groups.get()['effect'].get(effect, ())
+
+# Global spell index, rebuilt after spells.json is reloaded
+spell_index = SpellIndex()
+
 def get_spells_for_class(character_class: str) -> List[str]:
     """Get all spells available for a character class"""
-    return [spell_name for spell_name, spell_data in SPELLS.items() 
-            if spell_data["class"] == character_class]
+    return list(spell_index.for_class(character_class))
 
 def get_spells_by_level(character_class: str, spell_level: int) -> List[str]:
     """Get spells of a specific level for a character class"""
-    return [spell_name for spell_name, spell_data in SPELLS.items() 
-            if spell_data["class"] == character_class and spell_data["level"] == spell_level]
+    return list(spell_index.for_class_level(character_class, spell_level))
+
+def get_spells_by_school(school: str) -> List[str]:
+    """Get all spells of a school of magic"""
+    return list(spell_index.for_school(school))
+
+def get_spells_by_effect(effect: str) -> List[str]:
+    """Get all spells with an effect type (heal, damage, buff, status, utility)"""
+    return list(spell_index.for_effect(effect))
 
 def calculate_spell_slots(character: Dict[str, Any]) -> Dict[str, int]:
     """Calculate spell slots for a character based on level and ability scores"""
@@ -49,28 +94,72 @@ def calculate_spell_slots(character: Dict[str, Any]) -> Dict[str, int]:
     base_slots = SPELL_SLOTS[character_class][level].copy()
     
     # Add bonus spells for high ability scores
-    if character_class == "Cleric":
-        wisdom_mod = (character["abilities"]["wisdom"] - 10) // 2
-        if wisdom_mod > 0:
-            for spell_level in range(1, min(level + 1, 10)):
-                if str(spell_level) in base_slots:
-                    base_slots[str(spell_level)] += wisdom_mod
-    elif character_class == "Wizard":
-        int_mod = (character["abilities"]["intelligence"] - 10) // 2
-        if int_mod > 0:
-            for spell_level in range(1, min(level + 1, 10)):
-                if str(spell_level) in base_slots:
-                    base_slots[str(spell_level)] += int_mod
+    ability_mod = (character["abilities"][CASTING_ABILITY[character_class]] - 10) // 2
+    if ability_mod > 0:
+        for spell_level in range(1, min(level + 1, 10)):
+            if str(spell_level) in base_slots:
+                base_slots[str(spell_level)] += ability_mod
     
     return base_slots
 
+def _slot_ledger_key(character: Dict[str, Any]) -> List[Any]:
+    """What the maximum slots depend on: class, level and casting ability score"""
+    character_class = character["class"]
+    ability = CASTING_ABILITY.get(character_class)
+    score = character["abilities"][ability] if ability else None
+    return [character_class, character["level"], score]
+
+def get_spell_slots(character: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """
+    Get the character's spell slot ledger, stored in character['spell_slots'].
+    
+    The ledger holds the maximum and current slots per spell level and is only
+    recalculated when class, level or casting ability score change; slots
+    gained that way are available right away, slots already used stay used.
+    """
+    ledger = character.get("spell_slots")
+    key = _slot_ledger_key(character)
+    if ledger is not None and ledger["key"] == key:
+        return ledger
+    
+    maximum = calculate_spell_slots(character)
+    if ledger is None:
+        current = dict(maximum)
+    else:
+        old_max, old_current = ledger["max"], ledger["current"]
+        current = {
+            level: max(0, old_current.get(level, 0) + slots - old_max.get(level, 0))
+            for level, slots in maximum.items()
+        }
+    ledger = {"key": key, "max": maximum, "current": current}
+    character["spell_slots"] = ledger
+    return ledger
+
+def has_spell_slot(character: Dict[str, Any], spell_level: int) -> bool:
+    """Check if the character has an unused slot of a spell level"""
+    return get_spell_slots(character)["current"].get(str(spell_level), 0) > 0
+
+def consume_spell_slot(character: Dict[str, Any], spell_level: int) -> bool:
+    """Use up one slot of a spell level; False if none is left"""
+    current = get_spell_slots(character)["current"]
+    level = str(spell_level)
+    if current.get(level, 0) <= 0:
+        return False
+    current[level] -= 1
+    return True
+
+def refresh_spell_slots(character: Dict[str, Any]):
+    """Regain every spell slot (after a rest)"""
+    ledger = get_spell_slots(character)
+    ledger["current"] = dict(ledger["max"])
+
 def get_available_spells(character: Dict[str, Any]) -> Dict[str, List[str]]:
     """Get all spells available to a character, organized by level"""
     character_class = character["class"]
     available_spells = {}
     
     # Get spell slots
-    spell_slots = calculate_spell_slots(character)
+    spell_slots = get_spell_slots(character)["max"]
     
     # For each spell level the character has slots for
     for spell_level in spell_slots.keys():
@@ -84,84 +173,56 @@ def get_available_spells(character: Dict[str, Any]) -> Dict[str, List[str]]:
     
     return available_spells
 
-def cast_spell(character: Dict[str, Any], spell_name: str, target: Optional[Dict[str, Any]] = None) -> Tuple[bool, str, Optional[int]]:
+def cast_spell(character: Dict[str, Any], spell_name: str, target: Optional[Dict[str, Any]] = None,
+               rng: Optional[random.Random] = None) -> Tuple[bool, str, Optional[int]]:
     """Cast a spell and return (success, message, effect_value)"""
-    if spell_name not in SPELLS:
+    spell = compiled_spells.get(spell_name)
+    if spell is None:
         return False, f"Unknown spell: {spell_name}", None
     
-    spell = SPELLS[spell_name]
-    spell_level = spell["level"]
-    
     # Check if character has spell slots available
-    spell_slots = calculate_spell_slots(character)
-    if str(spell_level) not in spell_slots or spell_slots[str(spell_level)] <= 0:
-        return False, f"No spell slots available for level {spell_level} spells", None
-    
-    # Cast the spell based on its effect
-    if spell["effect"] == "heal":
-        if target is None:
-            target = character
-        
-        heal_amount = roll_dice(spell["heal_amount"])
-        old_hp = target["current_hp"]
-        target["current_hp"] = min(target["max_hp"], target["current_hp"] + heal_amount)
-        actual_heal = target["current_hp"] - old_hp
-        
-        message = f"{character['name']} casts {spell_name} on {target['name']}, healing {actual_heal} hit points!"
-        effect_value = actual_heal
-        
-    elif spell["effect"] == "damage":
-        if target is None:
-            return False, f"{spell_name} requires a target", None
-        
-        damage_amount = roll_dice(spell["damage_amount"])
-        damage_type = spell.get("damage_type", "magical")
-        
-        old_hp = target["current_hp"]
-        target["current_hp"] = max(0, target["current_hp"] - damage_amount)
-        actual_damage = old_hp - target["current_hp"]
-        
-        message = f"{character['name']} casts {spell_name} on {target['name']}, dealing {actual_damage} {damage_type} damage!"
-        effect_value = actual_damage
-        
-    elif spell["effect"] == "buff":
-        if target is None:
-            target = character
-        
-        buff_type = spell.get("buff_type", "general")
-        bonus = spell.get("bonus", 1)
-        
-        message = f"{character['name']} casts {spell_name} on {target['name']}, granting a +{bonus} {buff_type} bonus!"
-        effect_value = bonus
-        
-    elif spell["effect"] == "status":
-        if target is None:
-            return False, f"{spell_name} requires a target", None
-        
-        status_type = spell.get("status_type", "special")
-        message = f"{character['name']} casts {spell_name} on {target['name']}, applying {status_type} effect!"
-        effect_value = None
-        
-    else:  # utility
-        message = f"{character['name']} casts {spell_name}!"
-        effect_value = None
+    if not has_spell_slot(character, spell.level):
+        return False, f"No spell slots available for level {spell.level} spells", None
+    
+    # Cast the spell through its compiled effect
+    success, message, effect_value = spell.effect.cast(character, target, rng)
     
     # Consume spell slot
-    spell_slots[str(spell_level)] -= 1
-    return True, message, effect_value
+    if success:
+        consume_spell_slot(character, spell.level)
+    return success, message, effect_value
+
+def cast_area_spell(character: Dict[str, Any], spell_name: str, targets: List[Dict[str, Any]],
+                    rng: Optional[random.Random] = None) -> Tuple[bool, str, Optional[int], List[Optional[int]]]:
+    """Cast an area spell on all targets and return (success, message, total effect_value, effect_value per target)"""
+    spell = compiled_spells.get(spell_name)
+    if spell is None:
+        return False, f"Unknown spell: {spell_name}", None, []
+    
+    if not has_spell_slot(character, spell.level):
+        return False, f"No spell slots available for level {spell.level} spells", None, []
+    
+    # Resolve every target in one pass
+    success, message, total, values = spell.effect.cast_area(character, targets, rng)
+    
+    if success:
+        consume_spell_slot(character, spell.level)
+    return success, message, total, values
 
 def display_spell_list(character: Dict[str, Any]):
     """Display the character's available spells"""
+    from utils import console
+    
     console.print(f"\n[bold cyan]Spell List for {character['name']}[/bold cyan]")
     
     available_spells = get_available_spells(character)
-    spell_slots = calculate_spell_slots(character)
+    spell_slots = get_spell_slots(character)
     
     for level, spells in available_spells.items():
         if spells:
             console.print(f"\n[bold yellow]Level {level} Spells:[/bold yellow]")
-            slots_available = spell_slots.get(level, 0)
-            console.print(f"Slots available: {slots_available}")
+            slots_available = spell_slots["current"].get(level, 0)
+            console.print(f"Slots available: {slots_available}/{spell_slots['max'].get(level, 0)}")
             
             for spell_name in spells:
                 spell = SPELLS[spell_name]
@@ -170,8 +231,10 @@ def display_spell_list(character: Dict[str, Any]):
 
 def select_spell_to_cast(character: Dict[str, Any]) -> Optional[str]:
     """Let the player select a spell to cast"""
+    from utils import console, print_choice_menu
+    
     available_spells = get_available_spells(character)
-    spell_slots = calculate_spell_slots(character)
+    spell_slots = get_spell_slots(character)["current"]
     
     # Flatten available spells into a list
     spell_choices = []
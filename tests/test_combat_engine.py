@@ -0,0 +1,50 @@
+"""
+Tests for identity-based combatant tracking in the combat engine
+"""
+import pytest
+from character_rules import build_character
+from combat_engine import AttackFirstPolicy, CombatEngine
+from data_loader import data_loader
+from simulation import DEFAULT_ABILITIES
+
+
+@pytest.fixture
+def hero():
+    return build_character("Test Hero", "Human", "Fighter", DEFAULT_ABILITIES, 1)
+
+
+def test_identical_monsters_are_separate_combatants(hero):
+    goblin = dict(data_loader.monsters["Goblin"])
+    engine = CombatEngine([hero], [dict(goblin), dict(goblin)], AttackFirstPolicy())
+    first, second = engine.enemies
+    assert first.id != second.id
+
+    engine.apply_damage(first, first.max_hp)
+    assert not first.alive
+    assert second.alive
+    assert engine.opponents_of(engine.party[0]) == [second]
+    assert engine.result is None
+
+
+def test_duplicate_ids_are_replaced(hero):
+    goblin = dict(data_loader.monsters["Goblin"], id=7)
+    engine = CombatEngine([hero], [goblin, dict(goblin)], AttackFirstPolicy())
+    assert len({combatant.id for combatant in engine.combatants}) == 3
+
+
+def test_fight_ends_when_every_copy_is_down(hero):
+    goblin = dict(data_loader.monsters["Goblin"])
+    engine = CombatEngine([hero], [dict(goblin), dict(goblin)], AttackFirstPolicy())
+    for enemy in engine.enemies:
+        engine.apply_damage(enemy, enemy.max_hp)
+    result = engine.run()
+    assert result.outcome == "victory"
+    assert result.xp == 2 * goblin["xp_value"]
+
+
+def test_only_monsters_keep_their_combat_id(hero):
+    goblin = dict(data_loader.monsters["Goblin"])
+    engine = CombatEngine([hero], [goblin], AttackFirstPolicy())
+    engine.run()
+    assert 'id' not in hero
+    assert goblin['id'] == engine.enemies[0].id
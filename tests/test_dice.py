@@ -0,0 +1,86 @@
+"""
+Tests for the dice expression compiler
+"""
+import random
+import pytest
+from dice import DiceTerm, compile_dice, np
+
+
+@pytest.mark.parametrize("text, terms, modifier", [
+    ("1d20", (DiceTerm(1, 20, 1),), 0),
+    ("d20", (DiceTerm(1, 20, 1),), 0),
+    ("2d6+2", (DiceTerm(2, 6, 2),), 2),
+    ("1d8+1d6-1", (DiceTerm(1, 8, 1), DiceTerm(1, 6, 1)), -1),
+    ("1d4-1d6", (DiceTerm(1, 4, 1), DiceTerm(1, 6, 1, sign=-1)), 0),
+    ("5", (), 5),
+    (" 2 D 6 + 1 ", (DiceTerm(2, 6, 2),), 1),
+    ("4d6kh3", (DiceTerm(4, 6, 3),), 0),
+    ("4d6k3", (DiceTerm(4, 6, 3),), 0),
+    ("4d6dl1", (DiceTerm(4, 6, 3),), 0),
+    ("4d6d1", (DiceTerm(4, 6, 3),), 0),
+    ("2d20kl1", (DiceTerm(2, 20, 1, keep_highest=False),), 0),
+    ("4d6dh1", (DiceTerm(4, 6, 3, keep_highest=False),), 0),
+])
+def test_grammar(text, terms, modifier):
+    expression = compile_dice(text)
+    assert expression.terms == terms
+    assert expression.modifier == modifier
+
+
+@pytest.mark.parametrize("text", [
+    "", "d", "3d", "abc", "+", "2d6+", "1d6-", "1d6++2", "2d6 x",
+    "0d6", "1d0", "4d6kh5", "4d6kh0", "4d6dl4",
+])
+def test_malformed_expressions_raise(text):
+    with pytest.raises(ValueError):
+        compile_dice(text)
+
+
+def test_compiled_expressions_are_cached():
+    assert compile_dice("3d8+4") is compile_dice("3d8+4")
+
+
+@pytest.mark.parametrize("text, minimum, maximum", [
+    ("1d20", 1, 20),
+    ("2d6+2", 4, 14),
+    ("4d6dl1", 3, 18),
+    ("2d20kl1", 1, 20),
+    ("1d4-1d6", -5, 3),
+])
+def test_rolls_stay_within_bounds(text, minimum, maximum):
+    expression = compile_dice(text)
+    assert (expression.minimum, expression.maximum) == (minimum, maximum)
+    rng = random.Random(1)
+    rolls = {expression.roll(rng) for _ in range(5000)}
+    assert min(rolls) == minimum
+    assert max(rolls) == maximum
+
+
+def test_keep_and_drop_pick_the_right_dice():
+    # With every die showing its index (1, 2, 3, 4), keep/drop rules pick known totals
+    class Counting:
+        def __init__(self):
+            self.next = 0
+
+        def randint(self, low, high):
+            self.next += 1
+            return self.next
+
+    for text, total in [("4d6kh3", 9), ("4d6dl1", 9), ("4d6kl1", 1), ("4d6dh1", 6), ("4d6", 10)]:
+        assert compile_dice(text).roll(Counting()) == total, text
+
+
+def test_adding_a_bonus_keeps_the_dice():
+    expression = compile_dice("1d8") + 3
+    assert expression.terms == compile_dice("1d8").terms
+    assert expression.modifier == 3
+    assert compile_dice("1d8") + 0 is compile_dice("1d8")
+
+
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+def test_roll_batch_matches_bounds():
+    expression = compile_dice("4d6dl1+1")
+    totals = expression.roll_batch(10000, np.random.default_rng(1))
+    assert totals.shape == (10000,)
+    assert totals.min() == expression.minimum
+    assert totals.max() == expression.maximum
@@ -0,0 +1,87 @@
+"""
+Tests for alias-method encounter sampling
+"""
+import random
+from collections import Counter
+from math import sqrt
+import pytest
+from data_schema import MonsterDef
+from encounters import AliasTable, EncounterTable
+
+DRAWS = 100000
+
+
+def monster(name: str, level: int, xp_value: int, encounter_weight: float = 1.0) -> MonsterDef:
+    return MonsterDef.parse(name, {
+        "name": name, "level": level, "max_hp": 5, "armor_class": 12, "attack_bonus": 1,
+        "damage": "1d6", "xp_value": xp_value, "encounter_weight": encounter_weight
+    })
+
+
+@pytest.mark.parametrize("weights", [
+    [1, 1, 1, 1],
+    [1, 2, 3, 4],
+    [0.1, 10, 0.5],
+    [5, 0, 1],
+    [7],
+])
+def test_alias_table_frequencies(weights):
+    items = [f"item {i}" for i in range(len(weights))]
+    table = AliasTable(items, weights)
+    rng = random.Random(42)
+    counts = Counter(table.sample(rng) for _ in range(DRAWS))
+
+    total = sum(weights)
+    for item, weight in zip(items, weights):
+        p = weight / total
+        # Five standard errors of a binomial count
+        assert abs(counts[item] / DRAWS - p) <= 5 * sqrt(p * (1 - p) / DRAWS) + 1e-9, item
+    assert counts.keys() <= {item for item, weight in zip(items, weights) if weight > 0}
+
+
+@pytest.mark.parametrize("items, weights", [
+    ([], []),
+    (["a", "b"], [1]),
+    (["a"], [0]),
+    (["a", "b"], [1, -1]),
+])
+def test_alias_table_rejects_bad_weights(items, weights):
+    with pytest.raises(ValueError):
+        AliasTable(items, weights)
+
+
+@pytest.fixture
+def monsters():
+    return {
+        "Rat": monster("Rat", 1, 10, encounter_weight=3),
+        "Goblin": monster("Goblin", 1, 50),
+        "Orc": monster("Orc", 2, 100),
+        "Dragon": monster("Dragon", 9, 5000),
+    }
+
+
+def test_encounter_table_filters_by_level(monsters):
+    table = EncounterTable(1, monsters)
+    assert sorted(table.names) == ["Goblin", "Orc", "Rat"]
+    rng = random.Random(7)
+    counts = Counter(table.sample(rng) for _ in range(DRAWS))
+    assert counts["Rat"] / DRAWS == pytest.approx(3 / 5, abs=0.01)
+
+
+def test_sample_within_respects_the_budget(monsters):
+    table = EncounterTable(1, monsters)
+    rng = random.Random(7)
+    assert table.sample_within(rng, 5) is None
+    assert {table.sample_within(rng, 60) for _ in range(1000)} == {"Rat", "Goblin"}
+    assert {table.sample_within(rng, 10) for _ in range(100)} == {"Rat"}
+
+
+def test_sample_group_stays_within_budget(monsters):
+    table = EncounterTable(1, monsters)
+    rng = random.Random(7)
+    for _ in range(1000):
+        group = table.sample_group(rng, 150, max_size=3)
+        assert 1 <= len(group) <= 3
+        assert sum(monsters[name].xp_value for name in group) <= 150
+    assert table.sample_group(rng, 5) == []
+    assert table.sample_cheapest(rng) == "Rat"
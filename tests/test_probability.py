@@ -0,0 +1,92 @@
+"""
+Tests for the exact dice probability engine
+"""
+from collections import Counter
+from fractions import Fraction
+from itertools import product
+import pytest
+from dice import compile_dice
+from probability import (
+    Distribution, attack_damage_distribution, dice_distribution, expected_damage, hit_chance
+)
+
+EXPRESSIONS = ["1d20", "2d6+2", "4d6dl1", "2d20kh1", "2d20kl1", "3d4dh1", "1d8+1d6-1", "1d4-1d6", "5"]
+
+
+def brute_force(text: str) -> Counter:
+    """Exact distribution of an expression by enumerating every roll"""
+    expression = compile_dice(text)
+    totals = Counter({expression.modifier: Fraction(1)})
+    for term in expression.terms:
+        outcomes = Counter()
+        for rolls in product(range(1, term.sides + 1), repeat=term.count):
+            kept = sorted(rolls, reverse=term.keep_highest)[:term.keep]
+            outcomes[term.sign * sum(kept)] += Fraction(1, term.sides ** term.count)
+        combined = Counter()
+        for total, p in totals.items():
+            for value, q in outcomes.items():
+                combined[total + value] += p * q
+        totals = combined
+    return totals
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_distribution_matches_enumeration(text):
+    expected = brute_force(text)
+    dist = dice_distribution(text)
+    assert (dist.minimum, dist.maximum) == (min(expected), max(expected))
+    for value, p in dist.outcomes():
+        assert p == pytest.approx(float(expected[value]), abs=1e-12)
+    assert sum(p for _, p in dist.outcomes()) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("text, mean", [
+    ("1d20", 10.5),
+    ("2d6+2", 9.0),
+    ("1d8+1d6-1", 7.0),
+    ("4d6dl1", 15869 / 1296),
+    ("2d20kh1", 13.825),
+    ("2d20kl1", 7.175),
+])
+def test_means(text, mean):
+    assert dice_distribution(text).mean == pytest.approx(mean)
+
+
+def test_large_keep_term_matches_order_statistics():
+    # Highest of 8d20 is at most v with probability (v/20)^8
+    dist = dice_distribution("8d20kh1")
+    for value in range(1, 21):
+        assert dist.cdf(value) == pytest.approx((value / 20) ** 8)
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_variance_matches_enumeration(text):
+    expected = brute_force(text)
+    mean = sum(value * p for value, p in expected.items())
+    variance = sum((value - mean) ** 2 * p for value, p in expected.items())
+    assert dice_distribution(text).variance == pytest.approx(float(variance))
+
+
+def test_hit_chance():
+    assert hit_chance(0, 11) == 0.5
+    assert hit_chance(5, 15) == 0.55
+    assert hit_chance(20, 10) == 1.0
+    assert hit_chance(0, 30) == 0.0
+
+
+def test_attack_damage_counts_misses_and_clamps_at_zero():
+    # 1d4-2 deals 0, 0, 1 or 2 on a hit
+    dist = attack_damage_distribution(0, 11, "1d4", -2)
+    assert dist.minimum == 0
+    assert dist.prob(0) == pytest.approx(0.5 + 0.5 * 0.5)
+    assert dist.prob(2) == pytest.approx(0.5 * 0.25)
+    assert expected_damage(0, 11, "1d4", -2) == pytest.approx(0.5 * 0.75)
+
+
+def test_clamp_and_mix():
+    dist = Distribution.from_weights({-1: 0.25, 0: 0.25, 1: 0.5}).clamp(0)
+    assert (dist.minimum, dist.prob(0), dist.prob(1)) == (0, 0.5, 0.5)
+    mixed = Distribution.constant(4).mix(Distribution.constant(0), 0.25)
+    assert mixed.prob(4) == pytest.approx(0.25)
+    assert mixed.prob(0) == pytest.approx(0.75)
+    assert mixed.mean == pytest.approx(1.0)
@@ -0,0 +1,33 @@
+"""
+Tests for the Markov-chain combat solver against seeded simulation
+"""
+from math import sqrt
+import pytest
+from character_rules import build_character
+from combat_engine import AttackFirstPolicy, AttackWeakestPolicy
+from combat_solver import solve_combat
+from simulation import DEFAULT_ABILITIES, simulate_encounter
+
+TRIALS = 4000
+
+
+@pytest.mark.parametrize("character_class, level, monsters", [
+    ("Fighter", 1, ["Orc"]),
+    ("Wizard", 1, ["Goblin"]),
+    ("Fighter", 2, ["Goblin", "Goblin"]),
+    ("Cleric", 1, ["Zombie"]),
+])
+def test_solver_matches_simulation(character_class, level, monsters):
+    character = build_character("Test Hero", "Human", character_class, DEFAULT_ABILITIES, level)
+    solved = solve_combat(character, monsters, target="weakest")
+
+    # Play the fight the way the solver models it: weakest target, monsters always attack
+    report = simulate_encounter(
+        character, monsters, trials=TRIALS, workers=1, seed=1234,
+        player_policy=AttackWeakestPolicy(),
+        enemy_policy=AttackFirstPolicy(),
+    )
+    # Four standard errors: a correct solver fails this about once in 16000 runs
+    tolerance = 4 * sqrt(max(solved.win * (1 - solved.win), 0.01) / TRIALS)
+    assert report.win_rate == pytest.approx(solved.win, abs=tolerance)
+    assert solved.win + solved.loss + solved.flee + solved.stalemate == pytest.approx(1.0)
@@ -2,37 +2,75 @@
 Utility functions for D&D RPG game
 """
 import random
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
+from dice import DiceExpression, compile_dice, np
+from rng import rng_service, DICE, ATTACKS
 
-def roll_dice(num_dice: int, sides: int) -> int:
-    """Roll any number of dice with given sides"""
-    return sum(random.randint(1, sides) for _ in range(num_dice))
+ABILITY_SCORE_DICE = compile_dice("4d6dl1")
 
-def roll_ability_score() -> int:
+def roll_dice(dice: Union[str, int, DiceExpression], sides: int = None,
+              rng: Optional[random.Random] = None) -> int:
+    """
+    Roll a dice expression (e.g. '1d20', '2d4+2', '4d6dl1').
+
+    The legacy form roll_dice(num_dice, sides) is still accepted.
+    Rolls come from the "dice" stream unless another rng is given.
+    """
+    rng = rng or rng_service.stream(DICE)
+    if sides is not None:
+        return sum(rng.randint(1, sides) for _ in range(dice))
+    if not isinstance(dice, DiceExpression):
+        dice = compile_dice(dice)
+    return dice.roll(rng)
+
+def roll_ability_score(rng: Optional[random.Random] = None) -> int:
     """Roll 4d6 drop lowest for ability scores"""
-    rolls = [random.randint(1, 6) for _ in range(4)]
-    return sum(sorted(rolls)[1:])  # Drop lowest roll
+    return ABILITY_SCORE_DICE.roll(rng or rng_service.stream(DICE))
+
+def roll_dice_batch(dice: Union[str, DiceExpression], n: int, generator=None) -> "np.ndarray":
+    """Roll n copies of a dice expression at once, returning an array of totals"""
+    if not isinstance(dice, DiceExpression):
+        dice = compile_dice(dice)
+    return dice.roll_batch(n, generator if generator is not None else rng_service.generator(DICE))
+
+def roll_dice_array(expressions, generator=None) -> "np.ndarray":
+    """
+    Roll a sequence of (possibly different) dice expressions in one call.
+
+    Returns an array of totals aligned with the input. Each distinct
+    expression is rolled as a single vectorized batch.
+    """
+    if np is None:
+        raise ImportError("roll_dice_array requires NumPy (pip install numpy)")
+    generator = generator if generator is not None else rng_service.generator(DICE)
+    unique, inverse = np.unique(np.asarray(expressions, dtype=str), return_inverse=True)
+    totals = np.empty(len(inverse), dtype=np.int64)
+    for index, expression in enumerate(unique):
+        mask = inverse == index
+        totals[mask] = compile_dice(str(expression)).roll_batch(int(mask.sum()), generator)
+    return totals
+
+def roll_ability_scores(n: int, generator=None) -> "np.ndarray":
+    """Roll n ability scores (4d6 drop lowest) at once"""
+    return ABILITY_SCORE_DICE.roll_batch(n, generator if generator is not None else rng_service.generator(DICE))
 
 def calculate_modifier(score: int) -> int:
     """Calculate ability modifier from score"""
     return (score - 10) // 2
 
-def roll_attack(bonus: int) -> Tuple[int, bool]:
+def roll_attack(bonus: int, rng: Optional[random.Random] = None) -> Tuple[int, bool]:
     """
     Roll attack with bonus, return total and if critical
     """
-    roll = random.randint(1, 20)
+    roll = (rng or rng_service.stream(ATTACKS)).randint(1, 20)
     is_crit = roll == 20
     return roll + bonus, is_crit
 
-def roll_damage(damage_dice: str, bonus: int = 0) -> int:
+def roll_damage(damage_dice: Union[str, DiceExpression], bonus: int = 0,
+                rng: Optional[random.Random] = None) -> int:
     """
     Roll damage based on damage dice string (e.g. '2d6+2')
     """
-    # Strip any whitespace and plus sign
-    dice_str = damage_dice.replace(' ', '').replace('+', '')
-    
-    # Split into number of dice and sides
-    num_dice, sides = map(int, dice_str.lower().split('d'))
-    
-    return roll_dice(num_dice, sides) + bonus
\ No newline at end of file
+    if not isinstance(damage_dice, DiceExpression):
+        damage_dice = compile_dice(damage_dice)
+    return damage_dice.roll(rng or rng_service.stream(ATTACKS)) + bonus